@@ -0,0 +1,198 @@
+"""
+Hot/cold archival of closed contacts.
+
+People closed for longer than a cutoff are moved, with their touchpoints and
+follow-ups, out of the hot tables into `people_archive` as one JSON snapshot
+per person. Listings, company aggregation and reconciliation then only scan
+active outreach; archived records are read back on explicit request and can
+be restored.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from typing import Any, Optional
+
+from sqlalchemy import Date, DateTime, or_
+from sqlalchemy.orm import Session, selectinload
+
+try:
+    from . import models
+    from .attribution import attribute_reply, is_inbound_reply
+    from .contact_fields import sync_person_fields
+    from .dedupe import apply_person_keys
+    from .events import changed
+except ImportError:  # pragma: no cover
+    import models  # type: ignore
+    from attribution import attribute_reply, is_inbound_reply  # type: ignore
+    from contact_fields import sync_person_fields  # type: ignore
+    from dedupe import apply_person_keys  # type: ignore
+    from events import changed  # type: ignore
+
+_CHUNK = 200
+
+
+def _row_to_dict(obj: Any) -> dict:
+    out = {}
+    for column in obj.__table__.columns:
+        value = getattr(obj, column.key)
+        if isinstance(value, (datetime, date)):
+            value = value.isoformat()
+        out[column.key] = value
+    return out
+
+
+def _dict_to_columns(model: type, data: dict) -> dict:
+    """Inverse of `_row_to_dict`, ignoring keys the model no longer has."""
+    out = {}
+    for column in model.__table__.columns:
+        if column.key not in data:
+            continue
+        value = data[column.key]
+        if value is not None and isinstance(column.type, DateTime):
+            value = datetime.fromisoformat(value)
+        elif value is not None and isinstance(column.type, Date):
+            value = date.fromisoformat(value)
+        out[column.key] = value
+    return out
+
+
+def snapshot(person: models.Person) -> dict:
+    return {
+        "person": _row_to_dict(person),
+        "touchpoints": [_row_to_dict(tp) for tp in person.touchpoints],
+        "follow_ups": [_row_to_dict(fu) for fu in person.follow_ups],
+    }
+
+
+def archive_candidates(db: Session, older_than_days: int) -> list[int]:
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    return [
+        person_id
+        for (person_id,) in db.query(models.Person.id).filter(
+            models.Person.status == "closed",
+            models.Person.closed_at.isnot(None),
+            models.Person.closed_at <= cutoff,
+        )
+    ]
+
+
+def archive_people(db: Session, person_ids: list[int]) -> dict:
+    """Move `person_ids` and their history to the archive, committing per chunk."""
+    counts = {"people": 0, "touchpoints": 0, "follow_ups": 0}
+    for start in range(0, len(person_ids), _CHUNK):
+        chunk = person_ids[start : start + _CHUNK]
+        people = (
+            db.query(models.Person)
+            .options(selectinload(models.Person.touchpoints), selectinload(models.Person.follow_ups))
+            .filter(models.Person.id.in_(chunk))
+            .all()
+        )
+        now = datetime.utcnow()
+        db.bulk_insert_mappings(
+            models.ArchivedPerson,
+            [
+                {
+                    "person_id": p.id,
+                    "company_id": p.company_id,
+                    "name": p.name,
+                    "closed_at": p.closed_at,
+                    "archived_at": now,
+                    "payload": snapshot(p),
+                }
+                for p in people
+            ],
+        )
+
+        touchpoint_ids = db.query(models.Touchpoint.id).filter(models.Touchpoint.person_id.in_(chunk))
+        db.query(models.ReplyAttribution).filter(
+            or_(
+                models.ReplyAttribution.reply_touchpoint_id.in_(touchpoint_ids),
+                models.ReplyAttribution.sent_touchpoint_id.in_(touchpoint_ids),
+            )
+        ).delete(synchronize_session=False)
+        counts["touchpoints"] += (
+            db.query(models.Touchpoint)
+            .filter(models.Touchpoint.person_id.in_(chunk))
+            .delete(synchronize_session=False)
+        )
+        counts["follow_ups"] += (
+            db.query(models.FollowUp)
+            .filter(models.FollowUp.person_id.in_(chunk))
+            .delete(synchronize_session=False)
+        )
+        for child in (models.PersonChannel, models.PersonLink):
+            db.query(child).filter(child.person_id.in_(chunk)).delete(synchronize_session=False)
+        archived = db.query(models.Person).filter(models.Person.id.in_(chunk)).delete(synchronize_session=False)
+        if archived:
+            changed({"people": chunk, "touchpoints": None, "companies": None, "follow_ups": None}, db)
+        counts["people"] += archived
+        db.commit()
+        db.expunge_all()
+    return counts
+
+
+def archive_closed_people(db: Session, older_than_days: int) -> dict:
+    return archive_people(db, archive_candidates(db, older_than_days))
+
+
+def archived_person_view(entry: models.ArchivedPerson) -> dict:
+    """Shape an archive entry like `schemas.Person` for API responses."""
+    payload = entry.payload
+    return {
+        **payload["person"],
+        "company": entry.company,
+        "touchpoints": payload.get("touchpoints", []),
+        "follow_ups": payload.get("follow_ups", []),
+        "archived": True,
+        "archive_id": entry.archive_id,
+    }
+
+
+def restore_person(db: Session, archive_id: int) -> Optional[models.Person]:
+    """
+    Move the archive entry `archive_id` back into the hot tables. The person
+    keeps their old id unless it was reused meanwhile; touchpoints and
+    follow-ups get new ids.
+    """
+    entry = db.get(models.ArchivedPerson, archive_id)
+    if entry is None:
+        return None
+
+    payload = entry.payload
+    person_data = _dict_to_columns(models.Person, payload["person"])
+    if db.get(models.Person, entry.person_id) is not None:
+        person_data.pop("id", None)
+    person = models.Person(**person_data)
+    if person.closed_at is not None:
+        # Restart the archive clock, or the next archive pass would take the
+        # person straight back out. Reopening wouldn't stick: a closing
+        # touchpoint makes the status reconcile close them again.
+        person.closed_at = datetime.utcnow()
+    apply_person_keys(person, entry.company.name)
+    sync_person_fields(person)
+    db.add(person)
+    db.flush()
+
+    restored_touchpoints = []
+    for data in payload.get("touchpoints", []):
+        columns = _dict_to_columns(models.Touchpoint, data)
+        columns.pop("id", None)
+        columns["person_id"] = person.id
+        touchpoint = models.Touchpoint(**columns)
+        db.add(touchpoint)
+        restored_touchpoints.append(touchpoint)
+    for data in payload.get("follow_ups", []):
+        columns = _dict_to_columns(models.FollowUp, data)
+        columns.pop("id", None)
+        columns["person_id"] = person.id
+        db.add(models.FollowUp(**columns))
+    db.flush()
+
+    for touchpoint in restored_touchpoints:
+        if is_inbound_reply(touchpoint.direction, touchpoint.outcome):
+            attribute_reply(db, touchpoint)
+
+    db.delete(entry)
+    changed({"people": [person.id], "touchpoints": None, "companies": [person.company_id], "follow_ups": None}, db)
+    db.commit()
+    return person
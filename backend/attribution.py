@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+try:
+    from . import models
+    from .status import infer_direction, normalize_token
+except ImportError:  # pragma: no cover
+    import models  # type: ignore
+    from status import infer_direction, normalize_token  # type: ignore
+
+
+def is_outbound_send(direction: Optional[str], outcome: Optional[str]) -> bool:
+    return infer_direction(direction, outcome) == "outbound" and normalize_token(outcome) == "sent"
+
+
+def is_inbound_reply(direction: Optional[str], outcome: Optional[str]) -> bool:
+    return infer_direction(direction, outcome) == "inbound" and normalize_token(outcome) == "replied"
+
+
+# SQL equivalents over the derived columns kept by apply_touchpoint_derived_fields.
+IS_SEND = and_(models.Touchpoint.direction == "outbound", models.Touchpoint.outcome_token == "sent")
+IS_REPLY = and_(models.Touchpoint.direction == "inbound", models.Touchpoint.outcome_token == "replied")
+
+
+def _lag_seconds(reply_date: datetime, sent_date: datetime) -> int:
+    return int((reply_date - sent_date).total_seconds())
+
+
+def _latest_send_before(db: Session, reply: models.Touchpoint) -> Optional[models.Touchpoint]:
+    tp = models.Touchpoint
+    return (
+        db.query(tp)
+        .filter(
+            tp.person_id == reply.person_id,
+            IS_SEND,
+            or_(tp.date < reply.date, and_(tp.date == reply.date, tp.id < reply.id)),
+        )
+        .order_by(tp.date.desc(), tp.id.desc())
+        .first()
+    )
+
+
+def attribute_reply(db: Session, reply: models.Touchpoint) -> Optional[models.ReplyAttribution]:
+    """(Re)link `reply` to the latest send to the same person at or before it."""
+    existing = db.get(models.ReplyAttribution, reply.id)
+    sent = _latest_send_before(db, reply)
+    if sent is None:
+        if existing is not None:
+            db.delete(existing)
+        return None
+
+    if existing is None:
+        existing = models.ReplyAttribution(reply_touchpoint_id=reply.id)
+        db.add(existing)
+    existing.sent_touchpoint_id = sent.id
+    existing.lag_seconds = _lag_seconds(reply.date, sent.date)
+    return existing
+
+
+def record_touchpoint(db: Session, touchpoint: models.Touchpoint) -> None:
+    """
+    Keep `reply_attributions` current after `touchpoint` is inserted.
+    Must be called after a flush so the touchpoint has an id.
+    """
+    if is_inbound_reply(touchpoint.direction, touchpoint.outcome):
+        attribute_reply(db, touchpoint)
+        return
+
+    if not is_outbound_send(touchpoint.direction, touchpoint.outcome):
+        return
+
+    # A backdated send can become the closest send for replies already on file.
+    tp = models.Touchpoint
+    later = (
+        db.query(tp)
+        .filter(
+            tp.person_id == touchpoint.person_id,
+            tp.date >= touchpoint.date,
+            tp.id != touchpoint.id,
+            or_(IS_SEND, IS_REPLY),
+        )
+        .order_by(tp.date.asc(), tp.id.asc())
+        .all()
+    )
+    for other in later:
+        if other.direction == "outbound":
+            break
+        attribute_reply(db, other)
+
+
+def rebuild_attributions(db: Session) -> int:
+    """
+    Recompute every attribution in one pass over touchpoints sorted per
+    person. Left uncommitted for the caller.
+    """
+    tp = models.Touchpoint
+    db.query(models.ReplyAttribution).delete(synchronize_session=False)
+
+    rows = (
+        db.query(tp.id, tp.person_id, tp.date, tp.direction)
+        .filter(or_(IS_SEND, IS_REPLY))
+        .order_by(tp.person_id.asc(), tp.date.asc(), tp.id.asc())
+        .yield_per(1000)
+    )
+
+    links: list[dict] = []
+    current_person: Optional[int] = None
+    last_sent: Optional[tuple[int, datetime]] = None
+    for tp_id, person_id, tp_date, direction in rows:
+        if person_id != current_person:
+            current_person = person_id
+            last_sent = None
+        if tp_date is None:
+            continue
+        if direction == "outbound":
+            last_sent = (tp_id, tp_date)
+        elif last_sent is not None:
+            links.append(
+                {
+                    "reply_touchpoint_id": tp_id,
+                    "sent_touchpoint_id": last_sent[0],
+                    "lag_seconds": _lag_seconds(tp_date, last_sent[1]),
+                }
+            )
+
+    if links:
+        db.bulk_insert_mappings(models.ReplyAttribution, links)
+    return len(links)
+
+
+def backfill_reply_attributions(db: Session) -> int:
+    """Build the attribution table for databases that predate it."""
+    if db.query(models.ReplyAttribution.reply_touchpoint_id).first() is not None:
+        return 0
+    if db.query(models.Touchpoint.id).first() is None:
+        return 0
+    linked = rebuild_attributions(db)
+    db.commit()
+    return linked
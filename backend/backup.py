@@ -0,0 +1,320 @@
+"""
+Online SQLite backups.
+
+Snapshots are taken with SQLite's backup API a few hundred pages at a time,
+pausing between steps, so requests keep reading and writing while a backup
+runs instead of waiting on a file copy. Each finished snapshot is written
+under a temporary name and renamed into place, optionally gzipped, and only
+the newest `BACKUP_KEEP` are kept.
+
+    python -m backend.backup                      # snapshot into BACKUP_DIR
+    python -m backend.backup --compress --keep 3 --output /mnt/backups
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import logging
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Optional
+
+try:
+    from . import settings
+    from .locking import file_lock
+except ImportError:  # pragma: no cover
+    import settings  # type: ignore
+    from locking import file_lock  # type: ignore
+
+logger = logging.getLogger("outreachops.backup")
+
+# Gives writers a window between steps; a step of 256 pages is ~1 MB.
+_STEP_PAUSE_SECONDS = 0.005
+# Stepped copies restart when another connection writes; past this many
+# restarts the rest is copied in one step.
+_MAX_RESTARTS = 3
+
+
+class BackupInProgress(RuntimeError):
+    pass
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+_run_lock = threading.Lock()
+_progress_lock = threading.Lock()
+_progress: dict = {"running": False}
+
+
+def _set_progress(**values) -> None:
+    with _progress_lock:
+        _progress.update(values)
+
+
+def progress() -> dict:
+    """State of the current or last backup taken by this process."""
+    with _progress_lock:
+        state = dict(_progress)
+    total, remaining = state.get("pages_total"), state.get("pages_remaining")
+    if total:
+        state["percent"] = round(100 * (total - remaining) / total, 1)
+    return state
+
+
+def _snapshot_prefix(db_path: Path) -> str:
+    return db_path.stem + "-"
+
+
+def list_snapshots(db_path: Path, dest_dir: Path) -> list[Path]:
+    """Finished snapshots of `db_path` in `dest_dir`, newest first."""
+    if not dest_dir.is_dir():
+        return []
+    prefix = _snapshot_prefix(db_path)
+    snapshots = [
+        path
+        for path in dest_dir.iterdir()
+        if path.name.startswith(prefix) and (path.name.endswith(".db") or path.name.endswith(".db.gz"))
+    ]
+    # Names embed a sortable UTC timestamp.
+    return sorted(snapshots, key=lambda path: path.name, reverse=True)
+
+
+def prune_snapshots(db_path: Path, dest_dir: Path, keep: int) -> list[Path]:
+    removed = list_snapshots(db_path, dest_dir)[max(keep, 1):]
+    for path in removed:
+        path.unlink(missing_ok=True)
+    return removed
+
+
+def _copy(db_path: Path, target_path: Path, pages: int, progress: Optional[Callable]) -> None:
+    source = sqlite3.connect(str(db_path))
+    target = sqlite3.connect(str(target_path))
+    try:
+        source.backup(target, pages=pages, progress=progress)
+        # The snapshot is a standalone file; don't leave it in WAL mode.
+        target.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        target.close()
+        source.close()
+
+
+def backup_database(
+    db_path: Path,
+    dest_dir: Path,
+    compress: bool = False,
+    pages_per_step: int = 256,
+    keep: Optional[int] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    if_older_than: Optional[timedelta] = None,
+) -> Optional[Path]:
+    """
+    Copy `db_path` into a new timestamped snapshot in `dest_dir` and return
+    its path. With `if_older_than`, returns None instead when the newest
+    snapshot is younger than that. Raises BackupInProgress if this process is
+    already backing up, FileNotFoundError if `db_path` doesn't exist.
+    """
+    if not db_path.is_file():
+        # sqlite3.connect would silently create an empty database.
+        raise FileNotFoundError(f"no database at {db_path}")
+    if not _run_lock.acquire(blocking=False):
+        raise BackupInProgress("a backup is already running")
+    try:
+        # Another worker (or the CLI) backing up the same file waits here,
+        # then sees its snapshot when checking whether one is due.
+        with file_lock(db_path.with_name(db_path.name + ".backup.lock")):
+            if if_older_than is not None and not backup_due(db_path, dest_dir, if_older_than):
+                return None
+            return _backup_locked(db_path, dest_dir, compress, pages_per_step, keep, on_progress)
+    finally:
+        _run_lock.release()
+
+
+def _backup_locked(
+    db_path: Path,
+    dest_dir: Path,
+    compress: bool,
+    pages_per_step: int,
+    keep: Optional[int],
+    on_progress: Optional[Callable[[int, int], None]],
+) -> Path:
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%fZ")
+    final = dest_dir / f"{_snapshot_prefix(db_path)}{stamp}.db"
+    partial = final.with_name(final.name + ".partial")
+    packed = final.with_name(final.name + ".gz.partial")
+    _set_progress(
+        running=True,
+        started_at=datetime.utcnow().isoformat(),
+        finished_at=None,
+        path=None,
+        pages_total=None,
+        pages_remaining=None,
+        bytes=None,
+        error=None,
+    )
+
+    restarts = [0]
+
+    def step(status: int, remaining: int, total: int) -> None:
+        last = progress().get("pages_remaining")
+        if last is not None and remaining > last:
+            # A write from another connection restarted the copy.
+            restarts[0] += 1
+            if restarts[0] > _MAX_RESTARTS:
+                raise _TooManyRestarts
+        _set_progress(pages_total=total, pages_remaining=remaining)
+        if on_progress is not None:
+            on_progress(total - remaining, total)
+        time.sleep(_STEP_PAUSE_SECONDS)
+
+    try:
+        try:
+            _copy(db_path, partial, pages_per_step, step)
+        except _TooManyRestarts:
+            # Under steady writes a stepped copy may never finish; one step
+            # holds a single read transaction, which in WAL mode doesn't
+            # block writers either.
+            logger.info("backup restarted %d times, finishing in one step", restarts[0] - 1)
+            partial.unlink(missing_ok=True)
+            _copy(db_path, partial, -1, None)
+            _set_progress(pages_remaining=0)
+            if on_progress is not None:
+                total = progress()["pages_total"]
+                on_progress(total, total)
+
+        if compress:
+            with open(partial, "rb") as raw, gzip.open(packed, "wb") as out:
+                shutil.copyfileobj(raw, out, 1024 * 1024)
+            partial.unlink()
+            final = final.with_name(final.name + ".gz")
+            packed.replace(final)
+        else:
+            partial.replace(final)
+
+        if keep is not None:
+            prune_snapshots(db_path, dest_dir, keep)
+    except Exception as exc:
+        partial.unlink(missing_ok=True)
+        packed.unlink(missing_ok=True)
+        _set_progress(running=False, finished_at=datetime.utcnow().isoformat(), error=str(exc))
+        raise
+
+    _set_progress(
+        running=False,
+        finished_at=datetime.utcnow().isoformat(),
+        path=str(final),
+        bytes=final.stat().st_size,
+    )
+    logger.info("backup written to %s", final)
+    return final
+
+
+def backup_configured(
+    db_path: Path, compress: Optional[bool] = None, if_older_than: Optional[timedelta] = None
+) -> Optional[Path]:
+    return backup_database(
+        db_path,
+        Path(settings.BACKUP_DIR),
+        compress=settings.BACKUP_COMPRESS if compress is None else compress,
+        pages_per_step=settings.BACKUP_PAGES_PER_STEP,
+        keep=settings.BACKUP_KEEP or None,
+        if_older_than=if_older_than,
+    )
+
+
+def start_backup(db_path: Path, compress: Optional[bool] = None) -> threading.Thread:
+    """Run `backup_configured` in a background thread; poll `progress()`."""
+    if _run_lock.locked():
+        raise BackupInProgress("a backup is already running")
+
+    def run() -> None:
+        try:
+            backup_configured(db_path, compress)
+        except BackupInProgress:
+            pass
+        except Exception as exc:  # pragma: no cover - surfaced via progress()
+            logger.exception("backup failed")
+            _set_progress(running=False, error=str(exc))
+
+    # Reported straight away, before the thread gets to the backup lock.
+    _set_progress(running=True, finished_at=None, error=None)
+
+    thread = threading.Thread(target=run, name="outreachops-backup-once", daemon=True)
+    thread.start()
+    return thread
+
+
+def backup_due(db_path: Path, dest_dir: Path, max_age: timedelta) -> bool:
+    snapshots = list_snapshots(db_path, dest_dir)
+    if not snapshots:
+        return True
+    newest = datetime.fromtimestamp(snapshots[0].stat().st_mtime)
+    return datetime.now() - newest >= max_age
+
+
+def start_scheduler(db_path: Path, interval: timedelta) -> threading.Thread:
+    """Take a snapshot every `interval` in a daemon thread."""
+
+    def run() -> None:
+        while True:
+            try:
+                # Workers see each other's snapshots, so only one of them
+                # takes the backup each interval.
+                backup_configured(db_path, if_older_than=interval)
+            except BackupInProgress:
+                pass
+            except Exception:  # pragma: no cover
+                logger.exception("scheduled backup failed")
+            time.sleep(min(interval.total_seconds(), 300))
+
+    thread = threading.Thread(target=run, name="outreachops-backup", daemon=True)
+    thread.start()
+    return thread
+
+
+def main() -> int:
+    try:
+        from . import database
+    except ImportError:  # pragma: no cover
+        import database  # type: ignore
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default=settings.BACKUP_DIR, help="directory for snapshots")
+    parser.add_argument("--compress", action="store_true", default=settings.BACKUP_COMPRESS, help="gzip the snapshot")
+    parser.add_argument("--keep", type=int, default=settings.BACKUP_KEEP, help="snapshots to keep (0: keep all)")
+    parser.add_argument("--pages-per-step", type=int, default=settings.BACKUP_PAGES_PER_STEP)
+    args = parser.parse_args()
+
+    db_path = database.sqlite_path(database.engine)
+    if db_path is None:
+        print("backups are only supported for file-backed SQLite databases", file=sys.stderr)
+        return 2
+
+    def report(done: int, total: int) -> None:
+        print(f"\r{done}/{total} pages", end="", flush=True)
+
+    try:
+        path = backup_database(
+            db_path,
+            Path(args.output),
+            compress=args.compress,
+            pages_per_step=args.pages_per_step,
+            keep=args.keep or None,
+            on_progress=report,
+        )
+    except FileNotFoundError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    print(f"\n{path} ({path.stat().st_size} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Ad-hoc performance checks for the backend; run each module with `python -m`."""
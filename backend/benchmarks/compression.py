@@ -0,0 +1,101 @@
+"""
+Bytes on the wire and server latency for large API responses, per encoding.
+
+Seeds a fresh SQLite database, then fetches each endpoint with every
+Accept-Encoding the server supports. `est. total` adds the transfer time of
+the response body over a link of `--mbps` (default: a slow VPN). Requires
+`httpx` for FastAPI's TestClient.
+
+    python -m backend.benchmarks.compression --people 5000 --mbps 10
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+_CHILD = r"""
+import json, statistics, sys, time
+sys.path.insert(0, {root!r})
+from fastapi.testclient import TestClient
+from backend import database
+from backend.benchmarks.seed import seed
+from backend.compression import STREAM_ENCODERS
+from backend.main import app
+
+endpoints = [
+    "/api/people?limit=1000",
+    "/api/companies",
+    "/api/waitlist",
+    "/api/dashboard/today",
+]
+results = {{}}
+with TestClient(app) as client:
+    db = database.SessionLocal()
+    try:
+        seed(db, people={people}, companies=max(1, {people} // 5))
+    finally:
+        db.close()
+
+    for path in endpoints:
+        for coding in ["identity", *STREAM_ENCODERS]:
+            samples, size = [], 0
+            for _ in range({iterations}):
+                started = time.perf_counter()
+                with client.stream("GET", path, headers={{"accept-encoding": coding}}) as response:
+                    assert response.status_code < 400, (path, response.status_code)
+                    size = len(b"".join(response.iter_raw()))
+                    applied = response.headers.get("content-encoding", "identity")
+                samples.append((time.perf_counter() - started) * 1000)
+            samples.sort()
+            results[f"{{path}} [{{applied}}]"] = {{
+                "bytes": size,
+                "p50_ms": statistics.median(samples),
+                "p95_ms": samples[int(0.95 * (len(samples) - 1))],
+            }}
+print(json.dumps(results))
+"""
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--people", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--mbps", type=float, default=10.0, help="link speed used for the transfer estimate")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{(Path(tmp) / 'bench.db').as_posix()}"
+        out = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                _CHILD.format(root=str(ROOT), people=args.people, iterations=args.iterations),
+            ],
+            env={**os.environ, "OUTREACHOPS_DATABASE_URL": url, "OUTREACHOPS_RADAR_INGEST_MINUTES": "0"},
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+    results = json.loads(out.stdout.strip().splitlines()[-1])
+
+    header = f"{'request':48}{'bytes':>12}{'p50 ms':>10}{'p95 ms':>10}{'est. total ms':>16}"
+    print(header)
+    print("-" * len(header))
+    for name, row in results.items():
+        transfer_ms = row["bytes"] * 8 / (args.mbps * 1_000_000) * 1000
+        print(
+            f"{name:48}{row['bytes']:>12,}{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}"
+            f"{row['p50_ms'] + transfer_ms:>16.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""
+Mixed-workload load test.
+
+Starts uvicorn on a freshly seeded SQLite database (or targets `--url`) and
+drives it with `--concurrency` async clients picking requests from a weighted
+mix that mirrors real usage: mostly dashboard polls and list views, bursts of
+touchpoint writes, occasional analytics. Reports throughput, latency
+percentiles, errors and 503 "database busy" responses per endpoint. Requires
+`httpx` and `uvicorn`.
+
+    python -m backend.benchmarks.loadtest --people 5000 --concurrency 32 --duration 30
+    python -m backend.benchmarks.loadtest --mix dashboard=60,touchpoint=40 --workers 2
+    python -m backend.benchmarks.loadtest --url http://127.0.0.1:8000 --requests 2000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional
+
+ROOT = Path(__file__).resolve().parents[2]
+
+DEFAULT_MIX = {
+    "dashboard": 40,
+    "people": 15,
+    "companies": 10,
+    "person": 10,
+    "touchpoint": 15,
+    "waitlist": 5,
+    "weekly": 3,
+    "funnel": 2,
+}
+
+
+def _request(name: str, rng: random.Random, person_ids: list[int]) -> tuple[str, str, Optional[dict]]:
+    if name == "dashboard":
+        return "GET", "/api/dashboard/today", None
+    if name == "people":
+        return "GET", f"/api/people?limit=100&skip={rng.randrange(0, 10) * 100}", None
+    if name == "companies":
+        return "GET", "/api/companies", None
+    if name == "person":
+        return "GET", f"/api/people/{rng.choice(person_ids)}", None
+    if name == "touchpoint":
+        return "POST", f"/api/people/{rng.choice(person_ids)}/touchpoints", {
+            "date": datetime.utcnow().isoformat(),
+            "channel": "Email",
+            "outcome": "sent",
+            "message_preview": "load test",
+        }
+    if name == "waitlist":
+        return "GET", "/api/waitlist/page?limit=50", None
+    if name == "weekly":
+        return "GET", "/api/analytics/weekly", None
+    if name == "funnel":
+        return "GET", "/api/analytics/funnel", None
+    raise ValueError(f"unknown endpoint {name!r}")
+
+
+def _parse_mix(value: str) -> dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown endpoint {name!r} (choose from {', '.join(DEFAULT_MIX)})")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def _local_server(people: int, workers: int) -> Iterator[str]:
+    import httpx
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "OUTREACHOPS_DATABASE_URL": f"sqlite:///{(Path(tmp) / 'load.db').as_posix()}",
+            # Keep the background Radar fetch off the network and out of the numbers.
+            "OUTREACHOPS_RADAR_INGEST_MINUTES": "0",
+        }
+        subprocess.run(
+            [sys.executable, "-m", "backend.benchmarks.seed", "--people", str(people)],
+            cwd=ROOT,
+            env=env,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        port = _free_port()
+        server = subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "backend.main:app",
+                "--host", "127.0.0.1", "--port", str(port),
+                "--workers", str(workers), "--log-level", "warning",
+            ],
+            cwd=ROOT,
+            env=env,
+        )
+        url = f"http://127.0.0.1:{port}"
+        try:
+            deadline = time.monotonic() + 60
+            while True:
+                if server.poll() is not None:
+                    raise RuntimeError("uvicorn exited during startup")
+                try:
+                    if httpx.get(f"{url}/api/health/ready", timeout=1).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise RuntimeError("server did not become ready within 60s")
+                time.sleep(0.2)
+            yield url
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+
+async def _run(url: str, mix: dict[str, int], concurrency: int, duration: float, total: Optional[int], seed: int) -> dict:
+    import httpx
+
+    names, weights = list(mix), list(mix.values())
+    stats = {name: {"latencies": [], "errors": 0, "busy": 0} for name in names}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        person_ids = [p["id"] for p in (await client.get("/api/people?limit=500")).json()]
+        if not person_ids and {"person", "touchpoint"} & set(names):
+            raise RuntimeError("target has no people; seed it or drop person/touchpoint from --mix")
+        before = (await client.get("/api/health/db")).json()
+
+        remaining = [total]
+        deadline = time.monotonic() + duration
+
+        async def worker(index: int) -> None:
+            rng = random.Random(seed + index)
+            while time.monotonic() < deadline:
+                if remaining[0] is not None:
+                    if remaining[0] <= 0:
+                        return
+                    remaining[0] -= 1
+                name = rng.choices(names, weights)[0]
+                method, path, body = _request(name, rng, person_ids)
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, path, json=body)
+                    status = response.status_code
+                except httpx.HTTPError:
+                    status = None
+                stat = stats[name]
+                stat["latencies"].append((time.perf_counter() - started) * 1000)
+                if status == 503:
+                    stat["busy"] += 1
+                elif status is None or status >= 400:
+                    stat["errors"] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        after = (await client.get("/api/health/db")).json()
+
+    endpoints = {}
+    for name, stat in stats.items():
+        latencies = sorted(stat["latencies"])
+        endpoints[name] = {
+            "requests": len(latencies),
+            "rps": len(latencies) / elapsed,
+            "p50_ms": _percentile(latencies, 50),
+            "p95_ms": _percentile(latencies, 95),
+            "p99_ms": _percentile(latencies, 99),
+            "errors": stat["errors"],
+            "busy_503": stat["busy"],
+        }
+    return {
+        "elapsed_s": elapsed,
+        "requests": sum(e["requests"] for e in endpoints.values()),
+        "endpoints": endpoints,
+        # Counters are per process; with several workers this is one of them.
+        "server_busy_errors": after["busy_errors"] - before["busy_errors"] if after["pid"] == before["pid"] else None,
+        "dialect": after["dialect"],
+    }
+
+
+def _print_report(report: dict) -> None:
+    print(
+        f"{report['requests']} requests in {report['elapsed_s']:.1f}s "
+        f"({report['requests'] / report['elapsed_s']:.1f} req/s) against {report['dialect']}"
+    )
+    print(f"{'endpoint':<12} {'count':>7} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7} {'503':>6}")
+    for name, e in report["endpoints"].items():
+        print(
+            f"{name:<12} {e['requests']:>7} {e['rps']:>8.1f} {e['p50_ms']:>8.1f} "
+            f"{e['p95_ms']:>8.1f} {e['p99_ms']:>8.1f} {e['errors']:>7} {e['busy_503']:>6}"
+        )
+    if report["server_busy_errors"] is not None:
+        print(f"server-side busy errors: {report['server_busy_errors']}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="Load an already running server instead of a seeded local one")
+    parser.add_argument("--people", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes for the local server")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds to run")
+    parser.add_argument("--requests", type=int, default=None, help="stop after this many requests")
+    parser.add_argument(
+        "--mix",
+        type=_parse_mix,
+        default=DEFAULT_MIX,
+        help="weighted endpoints, e.g. dashboard=40,touchpoint=15 (default: %s)"
+        % ",".join(f"{k}={v}" for k, v in DEFAULT_MIX.items()),
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print the raw report as JSON")
+    args = parser.parse_args()
+
+    def run(url: str) -> dict:
+        duration = args.duration if args.requests is None else float("inf")
+        return asyncio.run(_run(url, args.mix, args.concurrency, duration, args.requests, args.seed))
+
+    if args.url:
+        report = run(args.url.rstrip("/"))
+    else:
+        with _local_server(args.people, args.workers) as url:
+            report = run(url)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""
+Synthetic data generator for benchmarks and load tests.
+
+Seeds whatever database OUTREACHOPS_DATABASE_URL points at (migrating it
+first), so never point it at real data:
+
+    OUTREACHOPS_DATABASE_URL=sqlite:////tmp/bench.db python -m backend.benchmarks.seed --people 20000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+from datetime import date, datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from .. import database, migrations, models
+from ..attribution import rebuild_attributions
+from ..contact_fields import backfill_contact_fields
+from ..dedupe import linkedin_handle, name_key
+from ..status import infer_direction, local_day_for, normalize_token, outcome_is_closed
+
+CHANNELS = ["LinkedIn DM", "Email", "LinkedIn InMail", "Referral intro", "Phone"]
+RELATIONSHIPS = ["cold", "warm", "alumni", "recruiter", "referral"]
+SPONSOR = ["yes", "no", "unknown"]
+OUTCOMES = ["sent", "sent", "sent", "replied", "no response", "closed"]
+
+
+def seed(
+    db: Session,
+    people: int = 2000,
+    companies: int = 400,
+    touchpoints_per_person: int = 6,
+    waitlist: int = 1000,
+    days: int = 180,
+    rng_seed: int = 42,
+) -> dict:
+    rng = random.Random(rng_seed)
+    now = datetime.utcnow()
+
+    first_company_id = (db.query(models.Company.id).order_by(models.Company.id.desc()).limit(1).scalar() or 0) + 1
+    db.bulk_insert_mappings(
+        models.Company,
+        [{"name": f"Company {first_company_id + i}", "sponsor_status": rng.choice(SPONSOR)} for i in range(companies)],
+    )
+    company_ids = [cid for (cid,) in db.query(models.Company.id).filter(models.Company.id >= first_company_id)]
+
+    first_person_id = (db.query(models.Person.id).order_by(models.Person.id.desc()).limit(1).scalar() or 0) + 1
+    people_rows = []
+    for i in range(people):
+        company_id = rng.choice(company_ids)
+        name = f"Contact {first_person_id + i}"
+        linkedin_url = f"https://www.linkedin.com/in/contact-{first_person_id + i}/"
+        people_rows.append(
+            {
+                "company_id": company_id,
+                "name": name,
+                "linkedin_url": linkedin_url,
+                "linkedin_handle": linkedin_handle(linkedin_url),
+                "name_key": name_key(name, f"Company {company_id}"),
+                "relationship": rng.choice(RELATIONSHIPS),
+                "why_reached_out": "Benchmark seed",
+                "sponsor_confidence": rng.choice(SPONSOR),
+                "status": rng.choice(["open", "open", "waiting", "closed"]),
+                "title": rng.choice(["Engineer", "Recruiter", "Manager", None]),
+                "outreach_channels": '["LinkedIn", "Email"]' if i % 2 else "email",
+                "created_at": now - timedelta(days=rng.randint(0, days)),
+            }
+        )
+    db.bulk_insert_mappings(models.Person, people_rows)
+    person_ids = [pid for (pid,) in db.query(models.Person.id).filter(models.Person.id >= first_person_id)]
+
+    touchpoints = []
+    follow_ups = []
+    for person_id in person_ids:
+        when = now - timedelta(days=rng.randint(1, days), minutes=rng.randint(0, 1440))
+        for _ in range(touchpoints_per_person):
+            outcome = rng.choice(OUTCOMES)
+            direction = infer_direction(None, outcome)
+            touchpoints.append(
+                {
+                    "person_id": person_id,
+                    "date": when,
+                    "channel": rng.choice(CHANNELS),
+                    "outcome": outcome,
+                    "direction": direction,
+                    "outcome_token": normalize_token(outcome),
+                    "is_closing": outcome_is_closed(outcome),
+                    "local_day": local_day_for(when),
+                    "message_preview": "Hi there, following up on my note.",
+                }
+            )
+            when += timedelta(hours=rng.randint(2, 96))
+        follow_ups.append(
+            {
+                "person_id": person_id,
+                "due_date": date.today() + timedelta(days=rng.randint(-10, 20)),
+                "action": "Follow Up",
+                "status": rng.choice(["open", "open", "done"]),
+            }
+        )
+    db.bulk_insert_mappings(models.Touchpoint, touchpoints)
+    db.bulk_insert_mappings(models.FollowUp, follow_ups)
+
+    db.bulk_insert_mappings(
+        models.Waitlist,
+        [
+            {
+                "company": f"Target {i}",
+                "priority": rng.choice("ABC"),
+                "planned_action_date": date.today() + timedelta(days=rng.randint(-7, 60)) if i % 5 else None,
+                "status": "active",
+            }
+            for i in range(waitlist)
+        ],
+    )
+    db.commit()
+    attributed = rebuild_attributions(db)
+    db.commit()
+    backfill_contact_fields(db)
+    return {
+        "companies": len(company_ids),
+        "people": len(person_ids),
+        "touchpoints": len(touchpoints),
+        "follow_ups": len(follow_ups),
+        "waitlist": waitlist,
+        "attributed_replies": attributed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--people", type=int, default=2000)
+    parser.add_argument("--companies", type=int, default=400)
+    parser.add_argument("--touchpoints-per-person", type=int, default=6)
+    parser.add_argument("--waitlist", type=int, default=1000)
+    args = parser.parse_args()
+
+    migrations.migrate(database.engine)
+    db = database.SessionLocal()
+    try:
+        counts = seed(
+            db,
+            people=args.people,
+            companies=args.companies,
+            touchpoints_per_person=args.touchpoints_per_person,
+            waitlist=args.waitlist,
+        )
+    finally:
+        db.close()
+    print(counts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Startup-cost regression benchmark.
+
+Each sample runs in a fresh interpreter so module import caches don't hide
+regressions. The first sample creates the schema; the rest measure the
+steady state where migrations are already current.
+
+    python -m backend.benchmarks.startup --runs 5 --max-import-ms 1500 --max-startup-ms 250
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+_CHILD = r"""
+import json, sys, time
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+import backend.main as main
+imported = time.perf_counter()
+for handler in main.app.router.on_startup:
+    handler()
+ready = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "feedparser_loaded": "feedparser" in sys.modules,
+}}))
+"""
+
+
+def _sample(db_url: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD.format(root=str(ROOT))],
+        env={**os.environ, "OUTREACHOPS_DATABASE_URL": db_url, "OUTREACHOPS_RADAR_INGEST_MINUTES": "0"},
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, default=None)
+    parser.add_argument("--max-startup-ms", type=float, default=None)
+    parser.add_argument("--database-url", default=None, help="Benchmark against this database instead of a temp SQLite file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = args.database_url or f"sqlite:///{(Path(tmp) / 'bench.db').as_posix()}"
+        first = _sample(db_url)
+        warm = [_sample(db_url) for _ in range(max(1, args.runs))]
+
+    import_ms = statistics.median(s["import_ms"] for s in warm)
+    startup_ms = statistics.median(s["startup_ms"] for s in warm)
+    print(f"first boot (creates schema): import {first['import_ms']:.1f} ms, startup {first['startup_ms']:.1f} ms")
+    print(f"warm boot median of {len(warm)}:  import {import_ms:.1f} ms, startup {startup_ms:.1f} ms")
+
+    failures = []
+    if any(s["feedparser_loaded"] for s in warm):
+        failures.append("feedparser was imported during startup")
+    if args.max_import_ms is not None and import_ms > args.max_import_ms:
+        failures.append(f"import {import_ms:.1f} ms exceeds budget {args.max_import_ms} ms")
+    if args.max_startup_ms is not None and startup_ms > args.max_startup_ms:
+        failures.append(f"startup {startup_ms:.1f} ms exceeds budget {args.max_startup_ms} ms")
+
+    for failure in failures:
+        print(f"REGRESSION: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
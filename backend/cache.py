@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+try:
+    from . import database
+except ImportError:  # pragma: no cover
+    import database  # type: ignore
+
+# Data versions live in `app_meta` so every worker process sees the same
+# numbers; a write in one worker invalidates cached results in all of them.
+_KEY_PREFIX = "data_version:"
+
+_BUMP_SQL = text(
+    "INSERT INTO app_meta (key, value) VALUES (:key, '1') "
+    "ON CONFLICT (key) DO UPDATE SET value = CAST(CAST(app_meta.value AS INTEGER) + 1 AS TEXT)"
+)
+_READ_SQL = text("SELECT key, value FROM app_meta WHERE key IN :keys").bindparams(
+    bindparam("keys", expanding=True)
+)
+
+
+def _bump(conn, tables: tuple[str, ...]) -> dict[str, int]:
+    keys = [_KEY_PREFIX + table for table in tables]
+    for key in keys:
+        conn.execute(_BUMP_SQL, {"key": key})
+    stored = dict(conn.execute(_READ_SQL, {"keys": keys}).all())
+    return {table: int(stored[key]) for table, key in zip(tables, keys)}
+
+
+def bump(*tables: str, db: Optional[Session] = None) -> dict[str, int]:
+    """
+    Mark `tables` as changed and return the new version of each. With `db`,
+    the bump joins that session's transaction, so it commits or rolls back
+    with the write it describes; call it before `db.commit()`.
+    """
+    if db is not None:
+        return _bump(db, tables)
+    with database.engine.begin() as conn:
+        return _bump(conn, tables)
+
+
+def versions(*tables: str) -> tuple[int, ...]:
+    keys = [_KEY_PREFIX + table for table in tables]
+    with database.engine.connect() as conn:
+        stored = dict(conn.execute(_READ_SQL, {"keys": keys}).all())
+    return tuple(int(stored.get(key) or 0) for key in keys)
+
+
+class VersionedCache:
+    """
+    Small per-process LRU cache whose entries are only valid for the data
+    versions of the tables they were computed from. A `bump()` on any of those
+    tables, from any process, makes existing entries stale without having to
+    track individual keys.
+    """
+
+    def __init__(self, *tables: str, max_entries: int = 128) -> None:
+        self.tables = tables
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, tuple[tuple[int, ...], Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        current = versions(*self.tables)
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None and hit[0] == current:
+                self._entries.move_to_end(key)
+                return hit[1]
+
+        value = compute()
+
+        with self._lock:
+            self._entries[key] = (current, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,113 @@
+"""
+Flags tracked companies mentioned in Radar articles.
+
+Company and waitlist names are normalized the same way as for duplicate
+detection (see dedupe.py) and compiled into one Aho-Corasick automaton, so
+an article is matched against every tracked name in a single pass over its
+text. The automaton is cached per process and rebuilt only when the
+`companies` or `waitlist` data version changes.
+"""
+from __future__ import annotations
+
+import re
+from collections import deque
+from typing import Hashable
+
+from sqlalchemy.orm import Session
+
+try:
+    from . import models
+    from .cache import VersionedCache
+    from .dedupe import fold_text, normalize_company
+except ImportError:  # pragma: no cover
+    import models  # type: ignore
+    from cache import VersionedCache  # type: ignore
+    from dedupe import fold_text, normalize_company  # type: ignore
+
+_TAGS = re.compile(r"<[^>]+>")
+# Shorter names match too many unrelated words.
+_MIN_NAME_LENGTH = 2
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher; each pattern carries a set of labels."""
+
+    def __init__(self, patterns: dict[str, set[Hashable]]) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[set[Hashable]] = [set()]
+
+        for pattern, labels in patterns.items():
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(set())
+                state = nxt
+            self._out[state] |= labels
+
+        # Breadth-first, so every fail link points at an already finished state.
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                self._out[nxt] |= self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> set[Hashable]:
+        found: set[Hashable] = set()
+        state = 0
+        for ch in text:
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            if self._out[state]:
+                found |= self._out[state]
+        return found
+
+
+def _pattern(name: str) -> str:
+    # Padding with spaces limits matches to whole words of the folded text.
+    normalized = normalize_company(name)
+    return f" {normalized} " if len(normalized) >= _MIN_NAME_LENGTH else ""
+
+
+def build_matcher(db: Session) -> AhoCorasick:
+    patterns: dict[str, set[Hashable]] = {}
+    for company_id, name in db.query(models.Company.id, models.Company.name):
+        pattern = _pattern(name)
+        if pattern:
+            patterns.setdefault(pattern, set()).add(("company", company_id))
+    for item_id, name in db.query(models.Waitlist.id, models.Waitlist.company).filter(
+        models.Waitlist.status == "active"
+    ):
+        pattern = _pattern(name)
+        if pattern:
+            patterns.setdefault(pattern, set()).add(("waitlist", item_id))
+    return AhoCorasick(patterns)
+
+
+_matcher_cache = VersionedCache("companies", "waitlist", max_entries=1)
+
+
+def get_matcher(db: Session) -> AhoCorasick:
+    return _matcher_cache.get_or_compute("matcher", lambda: build_matcher(db))
+
+
+def match_text(matcher: AhoCorasick, *parts: str) -> dict[str, list[int]]:
+    """{"company": [...ids], "waitlist": [...ids]} mentioned in `parts`."""
+    text = " " + " ".join(fold_text(_TAGS.sub(" ", part or "")) for part in parts) + " "
+    matches: dict[str, list[int]] = {"company": [], "waitlist": []}
+    for kind, target_id in matcher.find(text):
+        matches[kind].append(target_id)
+    for ids in matches.values():
+        ids.sort()
+    return matches
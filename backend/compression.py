@@ -0,0 +1,203 @@
+"""
+Content-encoding negotiation shared by static file serving and API responses.
+gzip is always available; brotli and zstd are used when the optional `brotli`
+and `zstandard` packages are installed.
+
+Static files are compressed once at the highest levels (`ENCODERS`); dynamic
+responses go through `CompressionMiddleware` with fast streaming compressors
+(`STREAM_ENCODERS`) so large or streamed bodies never have to be buffered.
+"""
+from __future__ import annotations
+
+import gzip
+import zlib
+from typing import Callable, Iterable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+Encoder = Callable[[bytes], bytes]
+
+
+class _StreamEncoder:
+    """Uniform `compress(chunk)` / `finish()` over zlib, brotli and zstd."""
+
+    def __init__(self, compress: Callable[[bytes], bytes], finish: Callable[[], bytes]) -> None:
+        self.compress = compress
+        self.finish = finish
+
+
+def _gzip_stream(level: int) -> _StreamEncoder:
+    obj = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip container
+    return _StreamEncoder(obj.compress, obj.flush)
+
+
+ENCODERS: dict[str, Encoder] = {
+    "gzip": lambda data: gzip.compress(data, compresslevel=9, mtime=0),
+}
+STREAM_ENCODERS: dict[str, Callable[[], _StreamEncoder]] = {
+    "gzip": lambda: _gzip_stream(6),
+}
+
+try:  # optional: pip install brotli
+    import brotli  # type: ignore
+
+    def _brotli_stream() -> _StreamEncoder:
+        obj = brotli.Compressor(quality=4)
+        return _StreamEncoder(obj.process, obj.finish)
+
+    ENCODERS["br"] = lambda data: brotli.compress(data, quality=11)
+    STREAM_ENCODERS["br"] = _brotli_stream
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:  # optional: pip install zstandard
+    import zstandard  # type: ignore
+
+    def _zstd_stream() -> _StreamEncoder:
+        obj = zstandard.ZstdCompressor(level=3).compressobj()
+        return _StreamEncoder(obj.compress, obj.flush)
+
+    STREAM_ENCODERS["zstd"] = _zstd_stream
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+# Server preference when the client accepts several encodings equally.
+PREFERENCE = ("zstd", "br", "gzip")
+
+
+def accepted_encodings(header: Optional[str]) -> dict[str, float]:
+    """Parse an Accept-Encoding header into {coding: q}."""
+    accepted: dict[str, float] = {}
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def negotiate(header: Optional[str], available: Iterable[str]) -> Optional[str]:
+    """Pick the best of `available` codings for the request, or None for identity."""
+    accepted = accepted_encodings(header)
+    wildcard = accepted.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in sorted(available, key=lambda c: PREFERENCE.index(c) if c in PREFERENCE else len(PREFERENCE)):
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+# Already compressed, or must reach the client unbuffered.
+_SKIP_TYPES = (
+    "image/",
+    "video/",
+    "audio/",
+    "font/",
+    "application/font-woff",
+    "application/x-font-woff",
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/x-bzip2",
+    "application/x-xz",
+    "application/x-7z-compressed",
+    "application/x-rar-compressed",
+    "application/zstd",
+    "application/pdf",
+    "text/event-stream",
+)
+
+
+class CompressionMiddleware:
+    """
+    Compress responses whose body reaches `minimum_size` bytes with the best
+    encoding the client accepts. Small single-message responses (dashboard
+    counts, health checks) pass through untouched; streamed responses are
+    compressed chunk by chunk as they are sent. Responses carrying an ETag
+    (the static manifest's) are left alone: the tag names those exact bytes,
+    and the manifest has already picked their encoding.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, encodings: Optional[Iterable[str]] = None) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = [c for c in (encodings or STREAM_ENCODERS) if c in STREAM_ENCODERS]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        coding = negotiate(Headers(scope=scope).get("accept-encoding"), self.encodings)
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressedResponder(self.app, coding, self.minimum_size)(scope, receive, send)
+
+
+class _CompressedResponder:
+    def __init__(self, app: ASGIApp, coding: str, minimum_size: int) -> None:
+        self.app = app
+        self.coding = coding
+        self.minimum_size = minimum_size
+        self.send: Send
+        self.start: Optional[Message] = None
+        self.encoder: Optional[_StreamEncoder] = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_wrapper)
+
+    async def send_wrapper(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            media_type = headers.get("content-type", "")
+            self.passthrough = (
+                "content-encoding" in headers or "etag" in headers or media_type.startswith(_SKIP_TYPES)
+            )
+            self.start = message
+            if self.passthrough:
+                await self.send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.encoder is None:
+            if not more_body and len(body) < self.minimum_size:
+                await self.send(self.start)
+                await self.send(message)
+                return
+            self.encoder = STREAM_ENCODERS[self.coding]()
+            headers = MutableHeaders(raw=self.start["headers"])
+            headers["Content-Encoding"] = self.coding
+            headers.add_vary_header("Accept-Encoding")
+            if "content-length" in headers:
+                del headers["content-length"]
+            if not more_body:
+                compressed = self.encoder.compress(body) + self.encoder.finish()
+                headers["Content-Length"] = str(len(compressed))
+                await self.send(self.start)
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+            await self.send(self.start)
+
+        chunk = self.encoder.compress(body)
+        if not more_body:
+            chunk += self.encoder.finish()
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
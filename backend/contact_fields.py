@@ -0,0 +1,127 @@
+"""
+Structured copies of the free-form `outreach_channels` and `links` fields.
+
+The Text columns stay what the API reads and writes ("JSON list or
+comma-separated"); every write also replaces the parsed rows in
+person_channels / person_links (and the waitlist equivalents), which carry
+the indexes used by the channel and link-domain filters.
+"""
+from __future__ import annotations
+
+import json
+from typing import Optional
+from urllib.parse import urlsplit
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+try:
+    from . import models
+except ImportError:  # pragma: no cover
+    import models  # type: ignore
+
+_CHANNEL_ALIASES = {
+    "e-mail": "email",
+    "mail": "email",
+    "linked in": "linkedin",
+    "linkedin dm": "linkedin",
+    "linkedin inmail": "linkedin",
+    "x": "twitter",
+    "twitter/x": "twitter",
+}
+
+
+def parse_list(value: Optional[str]) -> list[str]:
+    """Split a stored value in either format into unique, non-empty items."""
+    if not value or not value.strip():
+        return []
+    try:
+        parsed = json.loads(value)
+    except ValueError:
+        parsed = None
+    if isinstance(parsed, list):
+        items = [str(item) for item in parsed if item is not None]
+    elif isinstance(parsed, str):
+        items = [parsed]
+    else:
+        items = value.replace(";", ",").replace("\n", ",").split(",")
+
+    seen: dict[str, None] = {}
+    for item in items:
+        item = item.strip()
+        if item:
+            seen.setdefault(item, None)
+    return list(seen)
+
+
+def normalize_channel(value: str) -> str:
+    token = " ".join(value.strip().lower().split())
+    return _CHANNEL_ALIASES.get(token, token)
+
+
+def link_domain(url: str) -> Optional[str]:
+    if "://" not in url:
+        url = "https://" + url
+    host = (urlsplit(url).hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return host or None
+
+
+def channel_values(value: Optional[str]) -> list[str]:
+    return list(dict.fromkeys(normalize_channel(item) for item in parse_list(value)))
+
+
+def link_values(value: Optional[str]) -> list[tuple[str, Optional[str]]]:
+    return [(url, link_domain(url)) for url in parse_list(value)]
+
+
+def sync_person_fields(person: models.Person) -> None:
+    person.channel_entries = [models.PersonChannel(channel=c) for c in channel_values(person.outreach_channels)]
+    person.link_entries = [models.PersonLink(url=u, domain=d) for u, d in link_values(person.links)]
+
+
+def sync_waitlist_fields(item: models.Waitlist) -> None:
+    item.channel_entries = [models.WaitlistChannel(channel=c) for c in channel_values(item.outreach_channels)]
+    item.link_entries = [models.WaitlistLink(url=u, domain=d) for u, d in link_values(item.links)]
+
+
+def people_with_channel(channel: str):
+    return select(models.PersonChannel.person_id).where(models.PersonChannel.channel == normalize_channel(channel))
+
+
+def people_with_link_domain(domain: str):
+    return select(models.PersonLink.person_id).where(models.PersonLink.domain == link_domain(domain))
+
+
+def waitlist_with_channel(channel: str):
+    return select(models.WaitlistChannel.waitlist_id).where(
+        models.WaitlistChannel.channel == normalize_channel(channel)
+    )
+
+
+def waitlist_with_link_domain(domain: str):
+    return select(models.WaitlistLink.waitlist_id).where(models.WaitlistLink.domain == link_domain(domain))
+
+
+def backfill_contact_fields(db: Session) -> int:
+    """Parse every stored value into the child tables (used by migrations)."""
+    db.query(models.PersonChannel).delete(synchronize_session=False)
+    db.query(models.PersonLink).delete(synchronize_session=False)
+    db.query(models.WaitlistChannel).delete(synchronize_session=False)
+    db.query(models.WaitlistLink).delete(synchronize_session=False)
+
+    rows = 0
+    for owner, channel_model, link_model, key in (
+        (models.Person, models.PersonChannel, models.PersonLink, "person_id"),
+        (models.Waitlist, models.WaitlistChannel, models.WaitlistLink, "waitlist_id"),
+    ):
+        channels, links = [], []
+        for owner_id, channels_value, links_value in db.query(owner.id, owner.outreach_channels, owner.links):
+            channels.extend({key: owner_id, "channel": c} for c in channel_values(channels_value))
+            links.extend({key: owner_id, "url": u, "domain": d} for u, d in link_values(links_value))
+        db.bulk_insert_mappings(channel_model, channels)
+        db.bulk_insert_mappings(link_model, links)
+        rows += len(channels) + len(links)
+    db.commit()
+    return rows
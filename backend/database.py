@@ -1,23 +1,119 @@
+import hashlib
+import sqlite3
+import tempfile
+import threading
+from contextlib import AbstractContextManager, contextmanager
 from pathlib import Path
-from sqlalchemy import create_engine, text
-from sqlalchemy.engine import Engine
+from typing import Iterator, Optional
+from sqlalchemy import MetaData, create_engine, event, inspect, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateIndex
 
-_DB_PATH = (Path(__file__).resolve().parent / "outreach_ops.db").resolve()
-SQLALCHEMY_DATABASE_URL = f"sqlite:///{_DB_PATH.as_posix()}"
+try:
+    from . import settings
+    from .locking import file_lock
+except ImportError:  # pragma: no cover
+    import settings  # type: ignore
+    from locking import file_lock  # type: ignore
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
+
+
+def create_app_engine(url: str) -> Engine:
+    """Build an engine with the connection handling each backend needs."""
+    if make_url(url).get_backend_name() == "sqlite":
+        # Sessions are used from FastAPI's threadpool, not the creating thread.
+        return create_engine(url, connect_args={"check_same_thread": False})
+    return create_engine(
+        url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+
+
+def sqlite_path(engine: Engine) -> Optional[Path]:
+    """Filesystem path of a file-backed SQLite database, else None."""
+    if engine.dialect.name != "sqlite":
+        return None
+    database = engine.url.database
+    if not database or database == ":memory:" or database.startswith("file:"):
+        return None
+    return Path(database).resolve()
+
+
+engine = create_app_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-_SQLITE_REQUIRED_COLUMNS: dict[str, dict[str, str]] = {
+
+def _lock_path(engine: Engine, name: str) -> Path:
+    db_path = sqlite_path(engine)
+    if db_path is not None:
+        return db_path.with_name(f"{db_path.name}.{name}.lock")
+    digest = hashlib.sha1(engine.url.render_as_string(hide_password=True).encode()).hexdigest()[:12]
+    return Path(tempfile.gettempdir()) / f"outreachops-{digest}.{name}.lock"
+
+
+@contextmanager
+def app_lock(engine: Engine, name: str) -> Iterator[None]:
+    """
+    Serialize one kind of background work across worker processes.
+    PostgreSQL uses a session advisory lock so workers on other hosts are
+    covered too; SQLite and anything else use a file lock on this host.
+    """
+    if engine.dialect.name == "postgresql":
+        key = f"outreachops.{name}"
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_advisory_lock(hashtext(:key))"), {"key": key})
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(hashtext(:key))"), {"key": key})
+                conn.commit()
+        return
+
+    with file_lock(_lock_path(engine, name)):
+        yield
+
+
+def startup_lock(engine: Engine) -> AbstractContextManager:
+    """Held around migrations only, so booting workers never wait on background jobs."""
+    return app_lock(engine, "startup")
+
+
+@event.listens_for(Engine, "connect")
+def _configure_sqlite_connection(dbapi_connection, _connection_record) -> None:
+    """
+    WAL lets readers in other worker processes proceed while one writes, and
+    busy_timeout makes a writer wait for the lock instead of failing at once.
+    """
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+    finally:
+        cursor.close()
+
+_REQUIRED_COLUMNS: dict[str, dict[str, str]] = {
     "touchpoints": {
         "direction": "TEXT",
+        "outcome_token": "TEXT",
+        "is_closing": "BOOLEAN",
+        "local_day": "DATE",
     },
     "people": {
         "outreach_channels": "TEXT",
         "links": "TEXT",
+        "closed_at": "TIMESTAMP",
+        "linkedin_handle": "TEXT",
+        "name_key": "TEXT",
     },
     "waitlist": {
         "outreach_channels": "TEXT",
@@ -26,31 +122,20 @@ _SQLITE_REQUIRED_COLUMNS: dict[str, dict[str, str]] = {
 }
 
 
-def ensure_sqlite_columns(engine: Engine) -> None:
+def ensure_columns(engine: Engine) -> None:
     """
-    SQLite doesn't auto-migrate when SQLAlchemy models change.
+    `create_all` doesn't alter tables that already exist.
     This adds new nullable columns in-place so existing DBs keep working.
     """
-    if engine.dialect.name != "sqlite":
-        return
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
 
     with engine.begin() as conn:
-        for table_name, columns in _SQLITE_REQUIRED_COLUMNS.items():
-            table_exists = conn.execute(
-                text(
-                    "SELECT 1 FROM sqlite_master WHERE type='table' AND name=:name LIMIT 1"
-                ),
-                {"name": table_name},
-            ).first()
-            if not table_exists:
+        for table_name, columns in _REQUIRED_COLUMNS.items():
+            if table_name not in existing_tables:
                 continue
 
-            existing_columns = {
-                row[1]
-                for row in conn.exec_driver_sql(
-                    f'PRAGMA table_info("{table_name}")'
-                ).fetchall()
-            }
+            existing_columns = {col["name"] for col in inspector.get_columns(table_name)}
 
             for column_name, sql_type in columns.items():
                 if column_name in existing_columns:
@@ -60,6 +145,38 @@ def ensure_sqlite_columns(engine: Engine) -> None:
                 )
 
 
+def ensure_indexes(engine: Engine, metadata: MetaData) -> None:
+    """
+    `create_all` only emits indexes together with a brand new table.
+    Create any index declared on the models that an existing DB is missing.
+    """
+    with engine.begin() as conn:
+        for table in metadata.sorted_tables:
+            for index in table.indexes:
+                conn.execute(CreateIndex(index, if_not_exists=True))
+
+
+_busy_errors = 0
+_busy_lock = threading.Lock()
+
+
+def is_busy_error(exc: OperationalError) -> bool:
+    """SQLite gave up waiting for a lock (busy_timeout elapsed)."""
+    message = str(exc.orig).lower()
+    return "database is locked" in message or "database is busy" in message
+
+
+def record_busy_error() -> None:
+    global _busy_errors
+    with _busy_lock:
+        _busy_errors += 1
+
+
+def busy_error_count() -> int:
+    """Busy errors in this process since it started."""
+    return _busy_errors
+
+
 def get_db():
     db = SessionLocal()
     try:
@@ -0,0 +1,189 @@
+"""
+Duplicate contact detection.
+
+Every person carries two blocking keys, kept in indexed columns:
+
+* `linkedin_handle` - the `/in/<handle>` part of their LinkedIn URL, so
+  `https://www.linkedin.com/in/Jane-Doe/?utm=x` and `linkedin.com/in/jane-doe`
+  match;
+* `name_key` - normalized name tokens plus normalized company name, so
+  "Doe, Jane" at "ACME, Inc." and "Jane Doe" at "Acme" match.
+
+Checking a new contact is then two index lookups, and a full scan is two
+GROUP BYs over those columns merged with union-find.
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import Iterable, Optional
+from urllib.parse import unquote, urlsplit
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+try:
+    from . import models
+except ImportError:  # pragma: no cover
+    import models  # type: ignore
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+_LINKEDIN_PROFILE = re.compile(r"^/(?:in|pub)/([^/]+)")
+_COMPANY_SUFFIXES = {
+    "co", "company", "corp", "corporation", "gmbh", "inc", "incorporated",
+    "llc", "llp", "lp", "ltd", "limited", "plc", "pvt", "sa", "the",
+}
+
+
+def fold_text(value: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace."""
+    value = unicodedata.normalize("NFKD", value)
+    value = "".join(ch for ch in value if not unicodedata.combining(ch))
+    return " ".join(_NON_WORD.sub(" ", value.lower()).split())
+
+
+def linkedin_handle(url: Optional[str]) -> Optional[str]:
+    if not url or not url.strip():
+        return None
+    url = url.strip()
+    if "://" not in url:
+        url = "https://" + url
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if host != "linkedin.com" and not host.endswith(".linkedin.com"):
+        return None
+    match = _LINKEDIN_PROFILE.match(parts.path)
+    if not match:
+        return None
+    handle = unquote(match.group(1)).strip().lower()
+    return handle or None
+
+
+def normalize_company(name: Optional[str]) -> str:
+    tokens = fold_text(name or "").split()
+    while len(tokens) > 1 and tokens[-1] in _COMPANY_SUFFIXES:
+        tokens.pop()
+    if len(tokens) > 1 and tokens[0] == "the":
+        tokens.pop(0)
+    return " ".join(tokens)
+
+
+def name_key(name: Optional[str], company_name: Optional[str]) -> Optional[str]:
+    tokens = sorted(fold_text(name or "").split())
+    if not tokens:
+        return None
+    return " ".join(tokens) + "|" + normalize_company(company_name)
+
+
+def apply_person_keys(person: models.Person, company_name: Optional[str]) -> None:
+    person.linkedin_handle = linkedin_handle(person.linkedin_url)
+    person.name_key = name_key(person.name, company_name)
+
+
+def backfill_person_keys(db: Session, chunk_size: int = 5000) -> int:
+    rows = (
+        db.query(models.Person.id, models.Person.name, models.Person.linkedin_url, models.Company.name)
+        .outerjoin(models.Company, models.Company.id == models.Person.company_id)
+        .filter(models.Person.name_key.is_(None))
+        .all()
+    )
+    for start in range(0, len(rows), chunk_size):
+        db.bulk_update_mappings(
+            models.Person,
+            [
+                {
+                    "id": person_id,
+                    "linkedin_handle": linkedin_handle(url),
+                    "name_key": name_key(name, company_name),
+                }
+                for person_id, name, url, company_name in rows[start : start + chunk_size]
+            ],
+        )
+    db.commit()
+    return len(rows)
+
+
+def find_matches(
+    db: Session,
+    name: Optional[str],
+    company_name: Optional[str],
+    linkedin_url: Optional[str] = None,
+    exclude_id: Optional[int] = None,
+) -> list[dict]:
+    """Existing people that look like the given contact, strongest match first."""
+    matches: dict[int, dict] = {}
+    for reason, column, key in (
+        ("linkedin", models.Person.linkedin_handle, linkedin_handle(linkedin_url)),
+        ("name_company", models.Person.name_key, name_key(name, company_name)),
+    ):
+        if key is None:
+            continue
+        query = db.query(models.Person.id, models.Person.name).filter(column == key)
+        if exclude_id is not None:
+            query = query.filter(models.Person.id != exclude_id)
+        for person_id, person_name in query:
+            match = matches.setdefault(person_id, {"id": person_id, "name": person_name, "reasons": []})
+            match["reasons"].append(reason)
+    return list(matches.values())
+
+
+def _duplicate_groups(db: Session, column) -> Iterable[list[int]]:
+    keys = (
+        db.query(column)
+        .filter(column.isnot(None))
+        .group_by(column)
+        .having(func.count(models.Person.id) > 1)
+        .subquery()
+    )
+    rows = (
+        db.query(column, models.Person.id)
+        .join(keys, column == keys.c[0])
+        .order_by(column, models.Person.id)
+    )
+    group: list[int] = []
+    current = None
+    for key, person_id in rows:
+        if key != current and group:
+            yield group
+            group = []
+        current = key
+        group.append(person_id)
+    if group:
+        yield group
+
+
+def duplicate_clusters(db: Session) -> list[dict]:
+    """
+    Connected groups of people sharing a LinkedIn handle or a name key. Only
+    rows that share a key with someone else are ever loaded.
+    """
+    parent: dict[int, int] = {}
+
+    def find(x: int) -> int:
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    reasons: dict[int, set[str]] = {}
+    for reason, column in (("linkedin", models.Person.linkedin_handle), ("name_company", models.Person.name_key)):
+        for group in _duplicate_groups(db, column):
+            root = find(group[0])
+            for person_id in group[1:]:
+                other = find(person_id)
+                if other != root:
+                    parent[other] = root
+                    reasons.setdefault(root, set()).update(reasons.pop(other, set()))
+            reasons.setdefault(root, set()).add(reason)
+
+    members: dict[int, list[int]] = {}
+    for person_id in parent:
+        members.setdefault(find(person_id), []).append(person_id)
+
+    clusters = [
+        {"person_ids": sorted(ids), "reasons": sorted(reasons.get(root, ()))}
+        for root, ids in members.items()
+    ]
+    clusters.sort(key=lambda c: (-len(c["person_ids"]), c["person_ids"][0]))
+    return clusters
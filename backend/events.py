@@ -0,0 +1,140 @@
+"""
+Change notifications for connected clients (served as SSE by routers/events.py).
+
+Write paths call `changed()` before committing. That bumps the shared data
+versions (see cache.py) inside the write's own transaction and, once the
+session commits, hands one small event per table to every subscriber of this
+process. Writes made by other worker processes are picked
+up by polling those versions while anyone is subscribed.
+
+Each subscriber holds a short bounded queue; a client too slow to keep up has
+its backlog replaced by a single `resync` event instead of growing without
+bound.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from typing import Iterable, Mapping, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+try:
+    from . import cache, settings
+except ImportError:  # pragma: no cover
+    import cache, settings  # type: ignore
+
+logger = logging.getLogger("outreachops.events")
+
+# Tables clients care about; polled for writes made by other workers.
+WATCHED_TABLES = ("people", "touchpoints", "companies", "follow_ups", "waitlist", "news_items")
+
+RESYNC = {"table": "*", "ids": None, "version": None}
+
+
+class ChangeBroker:
+    def __init__(self, queue_size: int = 16, poll_interval: float = 2.0) -> None:
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self._subscribers: set[asyncio.Queue] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._poller: Optional[asyncio.Task] = None
+        self._seen: dict[str, int] = {}
+        self._seen_lock = threading.Lock()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    async def subscribe(self) -> asyncio.Queue:
+        self._loop = asyncio.get_running_loop()
+        if not self._subscribers:
+            # Start from the current versions so only later writes are reported.
+            self.mark_seen(dict(zip(WATCHED_TABLES, await asyncio.to_thread(cache.versions, *WATCHED_TABLES))))
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+        if not self._subscribers and self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
+
+    def publish(self, events: Iterable[dict]) -> None:
+        """Thread-safe: called from sync request handlers in the threadpool."""
+        loop = self._loop
+        if loop is None or not self._subscribers or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._fan_out, list(events))
+
+    def _fan_out(self, events: list[dict]) -> None:
+        for queue in list(self._subscribers):
+            for event in events:
+                try:
+                    queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    while not queue.empty():
+                        queue.get_nowait()
+                    queue.put_nowait(RESYNC)
+                    break
+
+    def mark_seen(self, versions: Mapping[str, int]) -> dict[str, int]:
+        """Record `versions` and return the ones that are newer than before."""
+        newer = {}
+        with self._seen_lock:
+            for table, version in versions.items():
+                if version > self._seen.get(table, 0):
+                    self._seen[table] = version
+                    newer[table] = version
+        return newer
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                current = await asyncio.to_thread(cache.versions, *WATCHED_TABLES)
+            except Exception:  # pragma: no cover - transient database errors
+                logger.exception("polling data versions failed")
+                continue
+            newer = self.mark_seen(dict(zip(WATCHED_TABLES, current)))
+            if newer:
+                self._fan_out([{"table": t, "ids": None, "version": v} for t, v in newer.items()])
+
+
+broker = ChangeBroker(poll_interval=settings.EVENTS_POLL_SECONDS)
+
+
+_PENDING_KEY = "outreachops.pending_changes"
+
+
+def changed(tables: Mapping[str, Optional[Iterable[int]]], db: Session) -> dict[str, int]:
+    """
+    Record writes pending in `db`, e.g. `changed({"touchpoints": [tp.id], "people": [pid]}, db)`,
+    before calling `db.commit()`. `ids` may be None when the affected rows are
+    not known individually. Subscribers hear about them only if the commit
+    goes through.
+    """
+    versions = cache.bump(*tables, db=db)
+    db.info.setdefault(_PENDING_KEY, []).extend(
+        {"table": table, "ids": None if ids is None else list(ids), "version": versions[table]}
+        for table, ids in tables.items()
+    )
+    return versions
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        broker.mark_seen({e["table"]: e["version"] for e in pending})
+        broker.publish(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,101 @@
+"""
+Startup bookkeeping: how long each init phase took and whether the deferred
+maintenance pass (timezone re-bucketing, status reconciliation, archival of
+long-closed people) has finished.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextlib import AbstractContextManager, contextmanager
+from datetime import datetime
+from typing import Callable, Iterator, Optional
+
+from sqlalchemy.orm import Session
+
+try:
+    from . import settings
+    from .archive import archive_closed_people
+    from .meta import get_meta, set_meta
+    from .status import reconcile_people_statuses, sync_reporting_timezone
+except ImportError:  # pragma: no cover
+    import settings  # type: ignore
+    from archive import archive_closed_people  # type: ignore
+    from meta import get_meta, set_meta  # type: ignore
+    from status import reconcile_people_statuses, sync_reporting_timezone  # type: ignore
+
+logger = logging.getLogger("outreachops.startup")
+
+_PROCESS_STARTED_AT = datetime.utcnow()
+
+_ready = threading.Event()
+_timings_ms: dict[str, float] = {}
+_error: Optional[str] = None
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _timings_ms[phase] = round((time.perf_counter() - started) * 1000, 2)
+        logger.info("startup phase %s took %.1f ms", phase, _timings_ms[phase])
+
+
+def _maintenance_done_since_boot(db: Session) -> bool:
+    finished = get_meta(db, "maintenance_finished_at")
+    return finished is not None and datetime.fromisoformat(finished) >= _PROCESS_STARTED_AT
+
+
+def run_maintenance(
+    session_factory: Callable[[], Session], lock: Callable[[], AbstractContextManager]
+) -> None:
+    global _error
+    db = session_factory()
+    try:
+        # With several workers booting together, the first one through the
+        # lock does the pass and the others see it already done.
+        with lock():
+            if _maintenance_done_since_boot(db):
+                return
+            with timed("sync_reporting_timezone"):
+                sync_reporting_timezone(db)
+            with timed("reconcile_people_statuses"):
+                reconcile_people_statuses(db)
+            if settings.ARCHIVE_AFTER_DAYS > 0:
+                with timed("archive_closed_people"):
+                    archive_closed_people(db, settings.ARCHIVE_AFTER_DAYS)
+            set_meta(db, "maintenance_finished_at", datetime.utcnow().isoformat())
+            db.commit()
+    except Exception as exc:  # pragma: no cover - surfaced via /api/health/ready
+        logger.exception("deferred startup maintenance failed")
+        _error = str(exc)
+    finally:
+        db.close()
+        _ready.set()
+
+
+def start_maintenance(
+    session_factory: Callable[[], Session], lock: Callable[[], AbstractContextManager]
+) -> threading.Thread:
+    """Run the per-boot maintenance pass without holding up request serving."""
+    _ready.clear()
+    thread = threading.Thread(
+        target=run_maintenance,
+        args=(session_factory, lock),
+        name="outreachops-maintenance",
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+
+def status() -> dict:
+    return {
+        "ready": _ready.is_set() and _error is None,
+        "maintenance_done": _ready.is_set(),
+        "error": _error,
+        "timings_ms": dict(_timings_ms),
+    }
@@ -1,35 +1,54 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import OperationalError
+from datetime import timedelta
 from pathlib import Path
-from starlette.staticfiles import StaticFiles
 
 # Support running as a package (`uvicorn backend.main:app`) and as a module from
 # within `backend/` (`uvicorn main:app`).
 try:
-    from . import database
-    from .models import Base
-    from .status import backfill_touchpoint_directions, reconcile_people_statuses
-    from .routers import analytics, people, radar, dashboard, companies, waitlist
+    from . import backup, database, lifecycle, migrations, news, settings
+    from .compression import CompressionMiddleware
+    from .static_assets import StaticManifest
+    from .routers import analytics, people, radar, dashboard, companies, waitlist, health, archive, events, duplicates, backups
 except ImportError:  # pragma: no cover
-    import database  # type: ignore
-    from models import Base  # type: ignore
-    from status import backfill_touchpoint_directions, reconcile_people_statuses  # type: ignore
-    from routers import analytics, people, radar, dashboard, companies, waitlist  # type: ignore
+    import backup, database, lifecycle, migrations, news, settings  # type: ignore
+    from compression import CompressionMiddleware  # type: ignore
+    from static_assets import StaticManifest  # type: ignore
+    from routers import analytics, people, radar, dashboard, companies, waitlist, health, archive, events, duplicates, backups  # type: ignore
 
 app = FastAPI(title="OutreachOps API")
 
 @app.on_event("startup")
 def _startup_init_db() -> None:
-    Base.metadata.create_all(bind=database.engine)
-    database.ensure_sqlite_columns(database.engine)
+    # Schema steps must finish before serving; they are a no-op once applied.
+    # Multiple workers may boot at once, so only one migrates at a time.
+    with lifecycle.timed("migrate"), database.startup_lock(database.engine):
+        migrations.migrate(database.engine)
 
-    db = database.SessionLocal()
-    try:
-        backfill_touchpoint_directions(db)
-        reconcile_people_statuses(db)
-    finally:
-        db.close()
+    # Consistency passes only touch existing rows, so run them in the
+    # background and report completion through /api/health/ready.
+    lifecycle.start_maintenance(
+        database.SessionLocal, lambda: database.app_lock(database.engine, "maintenance")
+    )
+    if settings.RADAR_INGEST_MINUTES > 0:
+        news.start_ingester(
+            database.SessionLocal,
+            lambda: database.app_lock(database.engine, "radar"),
+            timedelta(minutes=settings.RADAR_INGEST_MINUTES),
+        )
+    db_path = database.sqlite_path(database.engine)
+    if settings.BACKUP_INTERVAL_MINUTES > 0 and db_path is not None:
+        backup.start_scheduler(db_path, timedelta(minutes=settings.BACKUP_INTERVAL_MINUTES))
+
+@app.exception_handler(OperationalError)
+async def _database_busy(request: Request, exc: OperationalError):
+    # Lock contention is transient: tell the client to retry instead of a 500.
+    if not database.is_busy_error(exc):
+        raise exc
+    database.record_busy_error()
+    return JSONResponse({"detail": "Database busy, retry"}, status_code=503, headers={"Retry-After": "1"})
 
 # Configure CORS for local frontend development
 app.add_middleware(
@@ -44,6 +63,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESS_MIN_BYTES)
 
 app.include_router(people.router)
 app.include_router(radar.router)
@@ -51,30 +71,37 @@ app.include_router(dashboard.router)
 app.include_router(companies.router)
 app.include_router(waitlist.router)
 app.include_router(analytics.router)
+app.include_router(health.router)
+app.include_router(archive.router)
+app.include_router(events.router)
+app.include_router(duplicates.router)
+app.include_router(backups.router)
 
 _FRONTEND_DIST = Path(__file__).resolve().parent.parent / "frontend" / "dist"
 if _FRONTEND_DIST.exists():
-    _assets_dir = _FRONTEND_DIST / "assets"
-    if _assets_dir.exists():
-        app.mount(
-            "/assets",
-            StaticFiles(directory=_assets_dir),
-            name="frontend-assets",
-        )
+    _frontend = StaticManifest(_FRONTEND_DIST)
+
+    @app.on_event("startup")
+    def _load_frontend_manifest() -> None:
+        with lifecycle.timed("frontend_manifest"):
+            _frontend.load()
 
     @app.get("/", include_in_schema=False)
-    def _serve_index():
-        return FileResponse(_FRONTEND_DIST / "index.html")
+    def _serve_index(request: Request):
+        return _frontend.get("index.html").response(request)
 
     @app.get("/{full_path:path}", include_in_schema=False)
-    def _serve_spa(full_path: str):
-        if full_path.startswith("api"):
+    def _serve_spa(full_path: str, request: Request):
+        # Unknown API routes must not fall through to the SPA shell.
+        if full_path == "api" or full_path.startswith("api/"):
             raise HTTPException(status_code=404, detail="Not Found")
 
-        candidate = _FRONTEND_DIST / full_path
-        if candidate.is_file():
-            return FileResponse(candidate)
-        return FileResponse(_FRONTEND_DIST / "index.html")
+        asset = _frontend.get(full_path)
+        if asset is not None:
+            return asset.response(request)
+        if full_path.startswith("assets/"):
+            raise HTTPException(status_code=404, detail="Not Found")
+        return _frontend.get("index.html").response(request)
 else:
 
     @app.get("/")
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+try:
+    from . import models
+except ImportError:  # pragma: no cover
+    import models  # type: ignore
+
+
+def get_meta(db: Session, key: str) -> Optional[str]:
+    row = db.get(models.AppMeta, key)
+    return row.value if row is not None else None
+
+
+def set_meta(db: Session, key: str, value: str) -> None:
+    row = db.get(models.AppMeta, key)
+    if row is None:
+        db.add(models.AppMeta(key=key, value=value))
+    else:
+        row.value = value
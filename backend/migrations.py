@@ -0,0 +1,177 @@
+"""
+Ordered, idempotent schema migrations. The applied version is tracked with
+SQLite's `PRAGMA user_version`, or an `app_meta` row on other databases.
+
+Each step runs once per database; when the stored version already matches the
+latest step, startup costs a single pragma read. Steps must stay safe to re-run
+(databases created before versioning start at 0 and replay every step), and new
+steps are only ever appended.
+"""
+from __future__ import annotations
+
+from typing import Callable
+
+from sqlalchemy import func, inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+try:
+    from . import database, models
+    from .attribution import backfill_reply_attributions
+    from .contact_fields import backfill_contact_fields
+    from .dedupe import backfill_person_keys
+    from .models import Base
+    from .status import backfill_touchpoint_derived_fields
+except ImportError:  # pragma: no cover
+    import database, models  # type: ignore
+    from attribution import backfill_reply_attributions  # type: ignore
+    from contact_fields import backfill_contact_fields  # type: ignore
+    from dedupe import backfill_person_keys  # type: ignore
+    from models import Base  # type: ignore
+    from status import backfill_touchpoint_derived_fields  # type: ignore
+
+
+def _with_session(step: Callable) -> Callable[[Engine], None]:
+    def run(engine: Engine) -> None:
+        db = database.SessionLocal(bind=engine)
+        try:
+            step(db)
+        finally:
+            db.close()
+
+    return run
+
+
+def _create_tables(engine: Engine) -> None:
+    Base.metadata.create_all(bind=engine)
+    database.ensure_columns(engine)
+
+
+def _create_indexes(engine: Engine) -> None:
+    database.ensure_indexes(engine, Base.metadata)
+
+
+def _add_tables(engine: Engine) -> None:
+    """Create new tables and columns, then their indexes."""
+    _create_tables(engine)
+    _create_indexes(engine)
+
+
+def _add_person_keys(engine: Engine) -> None:
+    _add_tables(engine)
+    _with_session(backfill_person_keys)(engine)
+
+
+def _add_contact_fields(engine: Engine) -> None:
+    _add_tables(engine)
+    _with_session(backfill_contact_fields)(engine)
+
+
+def _backfill_closed_at(db: Session) -> None:
+    """Closed people predating `closed_at` count as closed at their last touch."""
+    last_touch = (
+        db.query(func.max(models.Touchpoint.date))
+        .filter(models.Touchpoint.person_id == models.Person.id)
+        .scalar_subquery()
+    )
+    db.query(models.Person).filter(
+        models.Person.status == "closed", models.Person.closed_at.is_(None)
+    ).update(
+        {models.Person.closed_at: func.coalesce(last_touch, models.Person.created_at)},
+        synchronize_session=False,
+    )
+    db.commit()
+
+
+def _default_waitlist_priority(db: Session) -> None:
+    """Older rows could have an empty or missing priority, which the page cursor can't tell apart."""
+    db.query(models.Waitlist).filter(
+        (models.Waitlist.priority.is_(None)) | (func.trim(models.Waitlist.priority) == "")
+    ).update({models.Waitlist.priority: "B"}, synchronize_session=False)
+    db.commit()
+
+
+def _archive_ids_autoincrement(engine: Engine) -> None:
+    """Rebuild people_archive with AUTOINCREMENT; other databases use sequences already."""
+    if engine.dialect.name != "sqlite":
+        return
+    table = models.ArchivedPerson.__table__
+    with engine.begin() as conn:
+        ddl = conn.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": table.name}
+        ).scalar()
+        if ddl is None or "AUTOINCREMENT" in ddl.upper():
+            return
+        indexes = conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :name AND sql IS NOT NULL"),
+            {"name": table.name},
+        ).scalars().all()
+        for index in indexes:
+            conn.execute(text(f'DROP INDEX "{index}"'))
+        conn.execute(text(f'ALTER TABLE "{table.name}" RENAME TO "_{table.name}_old"'))
+        table.create(conn)
+        columns = ", ".join(f'"{column.name}"' for column in table.columns)
+        conn.execute(text(f'INSERT INTO "{table.name}" ({columns}) SELECT {columns} FROM "_{table.name}_old"'))
+        conn.execute(text(f'DROP TABLE "_{table.name}_old"'))
+
+
+MIGRATIONS: list[tuple[int, str, Callable[[Engine], None]]] = [
+    (1, "create tables and add missing columns", _create_tables),
+    (2, "create model indexes", _create_indexes),
+    (3, "backfill derived touchpoint columns", _with_session(backfill_touchpoint_derived_fields)),
+    (4, "build reply attributions", _with_session(backfill_reply_attributions)),
+    (5, "add people archive and closed_at", _add_tables),
+    (6, "backfill closed_at for closed people", _with_session(_backfill_closed_at)),
+    (7, "add duplicate-detection keys to people", _add_person_keys),
+    (8, "parse outreach channels and links into child tables", _add_contact_fields),
+    (9, "add radar news archive", _add_tables),
+    (10, "index follow-ups by person and due date", _create_indexes),
+    (11, "default empty waitlist priorities to B", _with_session(_default_waitlist_priority)),
+    (12, "never reuse people archive ids", _archive_ids_autoincrement),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(engine: Engine) -> int:
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as conn:
+            return int(conn.exec_driver_sql("PRAGMA user_version").scalar() or 0)
+
+    with engine.connect() as conn:
+        if not inspect(conn).has_table("app_meta"):
+            return 0
+        value = conn.execute(
+            text("SELECT value FROM app_meta WHERE key = 'schema_version'")
+        ).scalar()
+    return int(value or 0)
+
+
+def _set_schema_version(engine: Engine, version: int) -> None:
+    with engine.begin() as conn:
+        if engine.dialect.name == "sqlite":
+            conn.exec_driver_sql(f"PRAGMA user_version = {int(version)}")
+            return
+        conn.execute(
+            text(
+                "INSERT INTO app_meta (key, value) VALUES ('schema_version', :value) "
+                "ON CONFLICT (key) DO UPDATE SET value = :value"
+            ),
+            {"value": str(int(version))},
+        )
+
+
+def migrate(engine: Engine) -> list[int]:
+    """Apply pending steps in order and return the versions that ran."""
+    current = get_schema_version(engine)
+    if current >= LATEST_VERSION:
+        return []
+
+    applied = []
+    for version, _description, step in MIGRATIONS:
+        if version <= current:
+            continue
+        step(engine)
+        _set_schema_version(engine, version)
+        applied.append(version)
+    return applied
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Text, Date
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Text, Date, Index, JSON, func
 from sqlalchemy.orm import relationship as sql_relationship, declarative_base
 from datetime import datetime
 
@@ -27,6 +27,10 @@ class Person(Base):
     status = Column(String, default="open")  # 'open', 'waiting', 'closed'
     title = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    closed_at = Column(DateTime, nullable=True)  # set by status.close_person
+    # Duplicate-detection blocking keys (see dedupe.apply_person_keys)
+    linkedin_handle = Column(String, nullable=True, index=True)
+    name_key = Column(String, nullable=True, index=True)
     
     # New fields
     outreach_channels = Column(Text, nullable=True) # JSON list of strings or comma-separated
@@ -35,6 +39,13 @@ class Person(Base):
     company = sql_relationship("Company", back_populates="contacts")
     touchpoints = sql_relationship("Touchpoint", back_populates="person", cascade="all, delete-orphan")
     follow_ups = sql_relationship("FollowUp", back_populates="person", cascade="all, delete-orphan")
+    # Parsed, indexed copies of outreach_channels / links (see contact_fields.py)
+    channel_entries = sql_relationship("PersonChannel", cascade="all, delete-orphan")
+    link_entries = sql_relationship("PersonLink", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index("ix_people_status_closed_at", "status", "closed_at"),
+    )
 
 class Touchpoint(Base):
     __tablename__ = "touchpoints"
@@ -45,10 +56,41 @@ class Touchpoint(Base):
     channel = Column(String, nullable=False)  # 'LinkedIn DM', 'email', etc.
     outcome = Column(String)  # 'sent', 'replied'
     direction = Column(String, nullable=True)  # 'outbound', 'inbound', 'other'
+    # Derived at write time (see status.apply_touchpoint_derived_fields)
+    outcome_token = Column(String, nullable=True)  # normalized outcome
+    is_closing = Column(Boolean, nullable=True)
+    local_day = Column(Date, nullable=True)  # calendar day in the reporting timezone
     message_preview = Column(Text, nullable=True)
     next_step_action = Column(String, nullable=True)
     
     person = sql_relationship("Person", back_populates="touchpoints")
+    attribution = sql_relationship(
+        "ReplyAttribution",
+        foreign_keys="ReplyAttribution.reply_touchpoint_id",
+        cascade="all, delete-orphan",
+        uselist=False,
+    )
+    attributed_replies = sql_relationship(
+        "ReplyAttribution",
+        foreign_keys="ReplyAttribution.sent_touchpoint_id",
+        cascade="all, delete-orphan",
+    )
+
+    __table_args__ = (
+        Index("ix_touchpoints_person_date", "person_id", "date"),
+        Index("ix_touchpoints_date", "date"),
+        Index("ix_touchpoints_kind_day", "direction", "outcome_token", "local_day"),
+        Index("ix_touchpoints_local_day", "local_day"),
+        Index("ix_touchpoints_closing_person", "is_closing", "person_id"),
+    )
+
+class ReplyAttribution(Base):
+    """Links an inbound reply to the outbound send it answers."""
+    __tablename__ = "reply_attributions"
+
+    reply_touchpoint_id = Column(Integer, ForeignKey("touchpoints.id", ondelete="CASCADE"), primary_key=True)
+    sent_touchpoint_id = Column(Integer, ForeignKey("touchpoints.id", ondelete="CASCADE"), nullable=False, index=True)
+    lag_seconds = Column(Integer, nullable=False)
 
 class FollowUp(Base):
     __tablename__ = "follow_ups"
@@ -61,6 +103,10 @@ class FollowUp(Base):
     
     person = sql_relationship("Person", back_populates="follow_ups")
 
+    __table_args__ = (
+        Index("ix_follow_ups_person_due", "person_id", "due_date"),
+    )
+
 class Waitlist(Base):
     __tablename__ = "waitlist"
     
@@ -75,3 +121,111 @@ class Waitlist(Base):
     # New fields match Person for easy conversion
     outreach_channels = Column(Text, nullable=True) # JSON/String
     links = Column(Text, nullable=True) # JSON/String
+    channel_entries = sql_relationship("WaitlistChannel", cascade="all, delete-orphan")
+    link_entries = sql_relationship("WaitlistLink", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Serves the prioritized listing (and its keyset pagination) plus the
+        # dashboard's active count without touching the table.
+        Index("ix_waitlist_status_priority_date", "status", "priority", "planned_action_date", "id"),
+        # Date-window filters and the "due this week" view.
+        Index("ix_waitlist_status_date", "status", "planned_action_date"),
+        Index("ix_waitlist_company_lower", func.lower(company)),
+    )
+
+class PersonChannel(Base):
+    __tablename__ = "person_channels"
+
+    person_id = Column(Integer, ForeignKey("people.id", ondelete="CASCADE"), primary_key=True)
+    channel = Column(String, primary_key=True)  # normalized, e.g. 'email', 'linkedin'
+
+    __table_args__ = (Index("ix_person_channels_channel", "channel", "person_id"),)
+
+class PersonLink(Base):
+    __tablename__ = "person_links"
+
+    id = Column(Integer, primary_key=True)
+    person_id = Column(Integer, ForeignKey("people.id", ondelete="CASCADE"), nullable=False, index=True)
+    url = Column(String, nullable=False)
+    domain = Column(String, nullable=True)  # lowercase host without 'www.'
+
+    __table_args__ = (Index("ix_person_links_domain", "domain", "person_id"),)
+
+class WaitlistChannel(Base):
+    __tablename__ = "waitlist_channels"
+
+    waitlist_id = Column(Integer, ForeignKey("waitlist.id", ondelete="CASCADE"), primary_key=True)
+    channel = Column(String, primary_key=True)
+
+    __table_args__ = (Index("ix_waitlist_channels_channel", "channel", "waitlist_id"),)
+
+class WaitlistLink(Base):
+    __tablename__ = "waitlist_links"
+
+    id = Column(Integer, primary_key=True)
+    waitlist_id = Column(Integer, ForeignKey("waitlist.id", ondelete="CASCADE"), nullable=False, index=True)
+    url = Column(String, nullable=False)
+    domain = Column(String, nullable=True)
+
+    __table_args__ = (Index("ix_waitlist_links_domain", "domain", "waitlist_id"),)
+
+class RadarQuery(Base):
+    """A Radar search fetched by the ingester, with its incremental watermark."""
+    __tablename__ = "radar_queries"
+
+    id = Column(Integer, primary_key=True)
+    query = Column(String, nullable=False, unique=True)
+    last_published_at = Column(DateTime, nullable=True)  # newest item seen (naive UTC)
+    last_fetched_at = Column(DateTime, nullable=True)
+    last_requested_at = Column(DateTime, nullable=True)
+
+class NewsItem(Base):
+    """A Radar article, stored once per canonical link (see news.py)."""
+    __tablename__ = "news_items"
+
+    id = Column(Integer, primary_key=True)
+    link = Column(String, nullable=False, unique=True)  # canonical form
+    title = Column(Text, nullable=False)
+    source = Column(String, nullable=True)
+    published = Column(String, nullable=True)  # as given by the feed
+    published_at = Column(DateTime, nullable=False)  # naive UTC
+    snippet = Column(Text, nullable=True)
+    fetched_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_news_items_published_at", "published_at"),
+        Index("ix_news_items_source_published_at", "source", "published_at"),
+    )
+
+class NewsItemQuery(Base):
+    __tablename__ = "news_item_queries"
+
+    query_id = Column(Integer, ForeignKey("radar_queries.id", ondelete="CASCADE"), primary_key=True)
+    news_item_id = Column(Integer, ForeignKey("news_items.id", ondelete="CASCADE"), primary_key=True, index=True)
+
+class AppMeta(Base):
+    """Small key/value store for schema and runtime bookkeeping."""
+    __tablename__ = "app_meta"
+
+    key = Column(String, primary_key=True)
+    value = Column(Text, nullable=True)
+
+class ArchivedPerson(Base):
+    """
+    A closed person moved out of the hot tables, together with their
+    touchpoints and follow-ups, as one JSON snapshot (see archive.py).
+    """
+    __tablename__ = "people_archive"
+    # Entries are addressed by archive_id, so a restored (deleted) entry's id
+    # must never be handed to the next one archived.
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    archive_id = Column(Integer, primary_key=True)
+    person_id = Column(Integer, nullable=False, index=True)  # id the person had while active
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False, index=True)
+    name = Column(String, nullable=False)
+    closed_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    payload = Column(JSON, nullable=False)
+
+    company = sql_relationship("Company")
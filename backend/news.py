@@ -0,0 +1,304 @@
+"""
+Local Radar archive.
+
+The ingester fetches Google News RSS for each tracked query and stores new
+articles in `news_items`, once per canonical link. Each `radar_queries` row
+remembers the newest `published` time seen, so a refresh only inserts newer
+items. `/api/radar` reads from the store; the network is only touched here.
+
+    python -m backend.news                       # refresh configured queries
+    python -m backend.news --query "cap-gap OPT" # fetch a specific query now
+"""
+from __future__ import annotations
+
+import argparse
+import calendar
+import logging
+import math
+import sys
+import threading
+import time
+from contextlib import AbstractContextManager
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Optional
+from urllib.parse import parse_qsl, quote_plus, urlencode, urlsplit, urlunsplit
+from urllib.request import Request, urlopen
+
+from sqlalchemy import DateTime, bindparam, or_, text
+from sqlalchemy.orm import Query, Session
+
+try:
+    from . import models, settings
+    from .events import changed
+except ImportError:  # pragma: no cover
+    import models, settings  # type: ignore
+    from events import changed  # type: ignore
+
+logger = logging.getLogger("outreachops.radar")
+
+DEFAULT_QUERY = "H-1B sponsor hiring"
+# Queries searched from the UI keep being refreshed for this long.
+_REQUESTED_QUERY_TTL = timedelta(days=7)
+# How stale `last_requested_at` may get before a read refreshes it; well
+# inside the TTL, so reads rarely have to write.
+_REQUEST_MARK_INTERVAL = timedelta(hours=1)
+_TRACKING_PARAMS = {"oc", "ref", "fbclid", "gclid", "mc_cid", "mc_eid"}
+_FETCH_TIMEOUT_SECONDS = 15
+# The ingester's first pass waits this long (or one interval, if shorter) so
+# boot stays fast and feedparser stays unloaded until it is needed.
+_FIRST_PASS_DELAY = timedelta(minutes=1)
+
+
+def normalize_query(query: Optional[str]) -> str:
+    return " ".join((query or "").split()) or DEFAULT_QUERY
+
+
+def canonical_link(url: str) -> str:
+    """Drop fragments, tracking parameters and host/scheme case differences."""
+    parts = urlsplit(url.strip())
+    params = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in _TRACKING_PARAMS and not key.lower().startswith("utm_")
+    ]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(params), ""))
+
+
+def parse_feed(feed) -> list[dict]:
+    """Turn a feedparser result into item dicts, skipping undated entries."""
+    items = []
+    for entry in getattr(feed, "entries", []):
+        link = getattr(entry, "link", "")
+        published_parsed = getattr(entry, "published_parsed", None)
+        if not link or not published_parsed:
+            continue
+        items.append(
+            {
+                "link": canonical_link(link),
+                "title": getattr(entry, "title", ""),
+                "source": entry.source.title
+                if hasattr(entry, "source") and hasattr(entry.source, "title")
+                else "Unknown",
+                "published": getattr(entry, "published", ""),
+                "published_at": datetime.utcfromtimestamp(calendar.timegm(published_parsed)),
+                "snippet": getattr(entry, "summary", ""),
+            }
+        )
+    return items
+
+
+def fetch_items(query: str, days: int) -> list[dict]:
+    # Bias results to recent items. Google News supports 'when:Xd' in the query.
+    safe_query = quote_plus(f"{query} when:{days}d")
+    rss_url = f"https://news.google.com/rss/search?q={safe_query}&hl=en-US&gl=US&ceid=US:en"
+    # Imported on first use: feedparser noticeably slows down API cold start.
+    import feedparser
+
+    # Downloaded here rather than by feedparser, which has no timeout.
+    request = Request(rss_url, headers={"User-Agent": feedparser.USER_AGENT})
+    try:
+        with urlopen(request, timeout=_FETCH_TIMEOUT_SECONDS) as response:
+            body = response.read()
+    except OSError as exc:
+        logger.warning("radar fetch failed for %r: %s", query, exc)
+        return []
+    return parse_feed(feedparser.parse(body))
+
+
+_REGISTER_SQL = text(
+    "INSERT INTO radar_queries (query, last_requested_at) VALUES (:query, :now) "
+    "ON CONFLICT (query) DO UPDATE SET last_requested_at = excluded.last_requested_at "
+    "WHERE radar_queries.last_requested_at IS NULL OR radar_queries.last_requested_at < :stale"
+).bindparams(bindparam("now", type_=DateTime()), bindparam("stale", type_=DateTime()))
+
+
+def mark_requested(db: Session, query: str) -> None:
+    """
+    Register `query` for the ingester, which fetches it on its next pass and
+    keeps it fresh while it is still being asked for. Only writes when the
+    query is new or its request time is older than `_REQUEST_MARK_INTERVAL`.
+    """
+    query = normalize_query(query)
+    now = datetime.utcnow()
+    row = db.query(models.RadarQuery.last_requested_at).filter(models.RadarQuery.query == query).first()
+    if row is not None and row[0] is not None and now - row[0] < _REQUEST_MARK_INTERVAL:
+        return
+    # An upsert, so concurrent first requests for the same query don't race
+    # on the unique constraint.
+    db.execute(_REGISTER_SQL, {"query": query, "now": now, "stale": now - _REQUEST_MARK_INTERVAL})
+    db.commit()
+
+
+def _get_or_create_query(db: Session, query: str) -> models.RadarQuery:
+    row = db.query(models.RadarQuery).filter(models.RadarQuery.query == query).first()
+    if row is None:
+        row = models.RadarQuery(query=query)
+        db.add(row)
+        db.flush()
+    return row
+
+
+def store_items(db: Session, radar_query: models.RadarQuery, items: Iterable[dict]) -> int:
+    """Insert items newer than the query's watermark; returns how many were new articles."""
+    watermark = radar_query.last_published_at
+    fresh: dict[str, dict] = {}
+    for item in items:
+        if watermark is None or item["published_at"] > watermark:
+            fresh.setdefault(item["link"], item)
+    if not fresh:
+        return 0
+
+    existing = dict(
+        db.query(models.NewsItem.link, models.NewsItem.id).filter(models.NewsItem.link.in_(list(fresh)))
+    )
+    new_rows = [item for link, item in fresh.items() if link not in existing]
+    if new_rows:
+        db.bulk_insert_mappings(models.NewsItem, new_rows)
+        existing.update(
+            db.query(models.NewsItem.link, models.NewsItem.id).filter(
+                models.NewsItem.link.in_([item["link"] for item in new_rows])
+            )
+        )
+
+    linked = {
+        item_id
+        for (item_id,) in db.query(models.NewsItemQuery.news_item_id).filter(
+            models.NewsItemQuery.query_id == radar_query.id,
+            models.NewsItemQuery.news_item_id.in_(list(existing.values())),
+        )
+    }
+    db.bulk_insert_mappings(
+        models.NewsItemQuery,
+        [
+            {"query_id": radar_query.id, "news_item_id": item_id}
+            for item_id in existing.values()
+            if item_id not in linked
+        ],
+    )
+    radar_query.last_published_at = max(item["published_at"] for item in fresh.values())
+    return len(new_rows)
+
+
+def ingest_query(
+    db: Session,
+    query: str,
+    fetch: Optional[Callable[[str, int], list[dict]]] = None,
+) -> int:
+    query = normalize_query(query)
+    watermark = db.query(models.RadarQuery.last_published_at).filter(models.RadarQuery.query == query).scalar()
+    now = datetime.utcnow()
+    if watermark is None:
+        days = settings.RADAR_BACKFILL_DAYS
+    else:
+        days = math.ceil((now - watermark) / timedelta(days=1))
+    # Fetch before writing anything: a write transaction held open across the
+    # network round-trip would lock out every other writer.
+    items = (fetch or fetch_items)(query, max(1, min(days, 30)))
+
+    radar_query = _get_or_create_query(db, query)
+    inserted = store_items(db, radar_query, items)
+    radar_query.last_fetched_at = now
+    if inserted:
+        changed({"news_items": None}, db)
+    db.commit()
+    return inserted
+
+
+def tracked_queries(db: Session) -> list[str]:
+    recent = datetime.utcnow() - _REQUESTED_QUERY_TTL
+    requested = [
+        query
+        for (query,) in db.query(models.RadarQuery.query).filter(models.RadarQuery.last_requested_at >= recent)
+    ]
+    return list(dict.fromkeys([normalize_query(q) for q in settings.RADAR_QUERIES] + requested))
+
+
+def ingest_due(db: Session, max_age: timedelta) -> dict[str, int]:
+    """Refresh every tracked query not fetched within `max_age`."""
+    results = {}
+    for query in tracked_queries(db):
+        row = db.query(models.RadarQuery).filter(models.RadarQuery.query == query).first()
+        if row is not None and row.last_fetched_at is not None and datetime.utcnow() - row.last_fetched_at < max_age:
+            continue
+        try:
+            results[query] = ingest_query(db, query)
+        except Exception:
+            db.rollback()
+            logger.exception("radar ingestion failed for %r", query)
+    return results
+
+
+def start_ingester(
+    session_factory: Callable[[], Session],
+    lock: Callable[[], AbstractContextManager],
+    interval: timedelta,
+) -> threading.Thread:
+    """Refresh tracked queries every `interval` in a daemon thread."""
+
+    def run() -> None:
+        time.sleep(min(_FIRST_PASS_DELAY, interval).total_seconds())
+        while True:
+            db = session_factory()
+            try:
+                # Workers share the fetch timestamps, so only one of them
+                # does the work each interval. The lock is the Radar one, not
+                # the startup lock, so booting workers never wait on a fetch.
+                with lock():
+                    ingest_due(db, interval)
+            except Exception:  # pragma: no cover
+                logger.exception("radar ingestion pass failed")
+            finally:
+                db.close()
+            time.sleep(interval.total_seconds())
+
+    thread = threading.Thread(target=run, name="outreachops-radar", daemon=True)
+    thread.start()
+    return thread
+
+
+def search(
+    db: Session,
+    query: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    source: Optional[str] = None,
+    text: Optional[str] = None,
+) -> Query:
+    items = db.query(models.NewsItem)
+    if query is not None:
+        items = items.join(models.NewsItemQuery).join(models.RadarQuery).filter(models.RadarQuery.query == query)
+    if since is not None:
+        items = items.filter(models.NewsItem.published_at >= since)
+    if until is not None:
+        items = items.filter(models.NewsItem.published_at < until)
+    if source:
+        items = items.filter(models.NewsItem.source == source)
+    if text and text.strip():
+        pattern = f"%{text.strip()}%"
+        items = items.filter(or_(models.NewsItem.title.ilike(pattern), models.NewsItem.snippet.ilike(pattern)))
+    return items.order_by(models.NewsItem.published_at.desc(), models.NewsItem.id.desc())
+
+
+def main() -> int:
+    try:
+        from . import database, migrations
+    except ImportError:  # pragma: no cover
+        import database, migrations  # type: ignore
+
+    parser = argparse.ArgumentParser(description="Fetch Radar news into the local archive.")
+    parser.add_argument("--query", action="append", help="query to fetch (repeatable); default: tracked queries")
+    args = parser.parse_args()
+
+    migrations.migrate(database.engine)
+    db = database.SessionLocal()
+    try:
+        for query in args.query or tracked_queries(db):
+            print(f"{normalize_query(query)}: {ingest_query(db, query)} new")
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,48 +1,63 @@
 from __future__ import annotations
 
-from bisect import bisect_right
-from datetime import date, datetime, time, timedelta, timezone
-from zoneinfo import ZoneInfo
+from datetime import date, datetime, timedelta
+from typing import Literal
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import and_, case, distinct, exists, func, null, select
 from sqlalchemy.orm import Session
 
 try:
-    from .. import database, models
-    from ..status import infer_direction, normalize_token
+    from .. import cache, database, models, settings
+    from ..attribution import IS_REPLY, IS_SEND, rebuild_attributions
 except ImportError:  # pragma: no cover
-    import database, models  # type: ignore
-    from status import infer_direction, normalize_token  # type: ignore
+    import cache, database, models, settings  # type: ignore
+    from attribution import IS_REPLY, IS_SEND, rebuild_attributions  # type: ignore
 
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
 
+REPLY_WINDOW = timedelta(days=7)
 
-def _to_utc_aware(dt: datetime) -> datetime:
-    if dt.tzinfo is None:
-        return dt.replace(tzinfo=timezone.utc)
-    return dt.astimezone(timezone.utc)
+FunnelDimension = Literal["channel", "relationship", "sponsor_confidence", "company"]
+
+_funnel_cache = cache.VersionedCache("touchpoints", "people", "companies")
 
 
 @router.get("/weekly")
 def get_weekly_analytics(week_start: date | None = None, db: Session = Depends(database.get_db)):
-    chicago = ZoneInfo("America/Chicago")
-
     if week_start is None:
-        today = datetime.now(chicago).date()
+        today = datetime.now(settings.reporting_zone()).date()
         monday = today - timedelta(days=today.weekday())
     else:
         monday = week_start - timedelta(days=week_start.weekday())
+    sunday = monday + timedelta(days=6)
+
+    tp = models.Touchpoint
+    is_inbound = tp.direction == "inbound"
+    day_counts = (
+        db.query(
+            tp.local_day,
+            func.sum(case((IS_SEND, 1), else_=0)),
+            func.sum(case((IS_REPLY, 1), else_=0)),
+            func.sum(case((and_(is_inbound, func.lower(tp.channel).like("%inmail%")), 1), else_=0)),
+        )
+        .filter(tp.local_day >= monday, tp.local_day <= sunday)
+        .group_by(tp.local_day)
+        .all()
+    )
 
-    start_local = datetime.combine(monday, time.min).replace(tzinfo=chicago)
-    end_local = start_local + timedelta(days=7)
-
-    start_utc_naive = start_local.astimezone(timezone.utc).replace(tzinfo=None)
-    end_utc_naive = end_local.astimezone(timezone.utc).replace(tzinfo=None)
-
-    touchpoints = (
-        db.query(models.Touchpoint)
-        .filter(models.Touchpoint.date >= start_utc_naive, models.Touchpoint.date < end_utc_naive)
+    # Replies are credited to the day of the send they answer, even when the
+    # reply itself lands after this week.
+    attributed_counts = (
+        db.query(tp.local_day, func.count(models.ReplyAttribution.reply_touchpoint_id))
+        .join(models.ReplyAttribution, models.ReplyAttribution.sent_touchpoint_id == tp.id)
+        .filter(
+            tp.local_day >= monday,
+            tp.local_day <= sunday,
+            models.ReplyAttribution.lag_seconds <= REPLY_WINDOW.total_seconds(),
+        )
+        .group_by(tp.local_day)
         .all()
     )
 
@@ -52,60 +67,12 @@ def get_weekly_analytics(week_start: date | None = None, db: Session = Depends(d
     recruiter_inmail = {d: 0 for d in day_keys}
     replies_attributed_to_sent_day = {d: 0 for d in day_keys}
 
-    outbound_sent_by_person: dict[int, tuple[list[datetime], list[date]]] = {}
-
-    for tp in touchpoints:
-        dt_utc = _to_utc_aware(tp.date)
-        dt_local = dt_utc.astimezone(chicago)
-        day = dt_local.date()
-        if day not in sent_outbound:
-            continue
-
-        direction = infer_direction(getattr(tp, "direction", None), tp.outcome)
-        outcome = normalize_token(tp.outcome)
-        channel = normalize_token(tp.channel)
-
-        if direction == "outbound" and outcome == "sent":
-            sent_outbound[day] += 1
-            times, days = outbound_sent_by_person.setdefault(tp.person_id, ([], []))
-            times.append(dt_utc)
-            days.append(day)
-
-        if direction == "inbound" and outcome == "replied":
-            replies_inbound[day] += 1
-
-        if direction == "inbound" and "inmail" in channel:
-            recruiter_inmail[day] += 1
-
-    for person_id, (times, days) in outbound_sent_by_person.items():
-        if len(times) <= 1:
-            continue
-        zipped = sorted(zip(times, days), key=lambda x: x[0])
-        outbound_sent_by_person[person_id] = ([t for t, _ in zipped], [d for _, d in zipped])
-
-    for tp in touchpoints:
-        direction = infer_direction(getattr(tp, "direction", None), tp.outcome)
-        outcome = normalize_token(tp.outcome)
-        if not (direction == "inbound" and outcome == "replied"):
-            continue
-
-        reply_dt = _to_utc_aware(tp.date)
-        sent = outbound_sent_by_person.get(tp.person_id)
-        if not sent:
-            continue
-        sent_times, sent_days = sent
-
-        idx = bisect_right(sent_times, reply_dt) - 1
-        if idx < 0:
-            continue
-
-        sent_dt = sent_times[idx]
-        if reply_dt - sent_dt > timedelta(days=7):
-            continue
-
-        sent_day = sent_days[idx]
-        if sent_day in replies_attributed_to_sent_day:
-            replies_attributed_to_sent_day[sent_day] += 1
+    for day, sent, replies, inmail in day_counts:
+        sent_outbound[day] = sent or 0
+        replies_inbound[day] = replies or 0
+        recruiter_inmail[day] = inmail or 0
+    for day, attributed in attributed_counts:
+        replies_attributed_to_sent_day[day] = attributed
 
     return {
         "week_start": monday.isoformat(),
@@ -126,3 +93,120 @@ def get_weekly_analytics(week_start: date | None = None, db: Session = Depends(d
         ],
     }
 
+
+def _funnel_rows(db: Session, start: date, end: date, dimension: str) -> list[dict]:
+    tp = models.Touchpoint
+    sent = (
+        select(tp.id, tp.person_id, tp.channel)
+        .where(IS_SEND, tp.local_day >= start, tp.local_day <= end)
+        .subquery("sent")
+    )
+    attribution = models.ReplyAttribution
+    answered = exists().where(
+        attribution.sent_touchpoint_id == sent.c.id,
+        attribution.lag_seconds <= REPLY_WINDOW.total_seconds(),
+    )
+
+    person = models.Person
+    company = models.Company
+    if dimension == "channel":
+        key = func.lower(func.trim(sent.c.channel))
+        group_by = [key]
+    elif dimension == "relationship":
+        key = func.lower(func.coalesce(person.relationship, "unknown"))
+        group_by = [key]
+    elif dimension == "sponsor_confidence":
+        key = func.lower(func.coalesce(person.sponsor_confidence, "unknown"))
+        group_by = [key]
+    elif dimension == "company":
+        key = company.name
+        group_by = [company.id, company.name]
+    else:  # pragma: no cover - guarded by the FunnelDimension type
+        raise HTTPException(status_code=400, detail="Unknown dimension")
+
+    sent_count = func.count(sent.c.id)
+    answered_count = func.sum(case((answered, 1), else_=0))
+    stmt = (
+        select(
+            key.label("key"),
+            (company.id if dimension == "company" else null()).label("company_id"),
+            sent_count.label("sent"),
+            answered_count.label("replied"),
+            func.count(distinct(sent.c.person_id)).label("people_contacted"),
+            func.count(
+                distinct(case((answered, sent.c.person_id)))
+            ).label("people_replied"),
+            func.sum(sent_count).over().label("total_sent"),
+            func.rank().over(order_by=sent_count.desc()).label("rank"),
+        )
+        .select_from(
+            sent.join(person, person.id == sent.c.person_id)
+            .join(company, company.id == person.company_id)
+        )
+        .group_by(*group_by)
+        .order_by(sent_count.desc(), key)
+    )
+
+    rows = []
+    for row in db.execute(stmt):
+        rows.append(
+            {
+                "key": row.key,
+                "company_id": row.company_id,
+                "sent": row.sent,
+                "replied": row.replied,
+                "response_rate": row.replied / row.sent if row.sent else 0.0,
+                "people_contacted": row.people_contacted,
+                "people_replied": row.people_replied,
+                "share_of_sent": row.sent / row.total_sent if row.total_sent else 0.0,
+                "rank": row.rank,
+            }
+        )
+    return rows
+
+
+@router.get("/funnel")
+def get_funnel_analytics(
+    dimension: FunnelDimension = "channel",
+    start: date | None = None,
+    end: date | None = None,
+    db: Session = Depends(database.get_db),
+):
+    """
+    Outbound sends, attributed replies and response rate grouped by
+    `dimension` over local dates `start`..`end` (inclusive, default last 30 days).
+    """
+    if end is None:
+        end = datetime.now(settings.reporting_zone()).date()
+    if start is None:
+        start = end - timedelta(days=29)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must be on or before end")
+
+    groups = _funnel_cache.get_or_compute(
+        (start, end, dimension),
+        lambda: _funnel_rows(db, start, end, dimension),
+    )
+
+    total_sent = sum(g["sent"] for g in groups)
+    total_replied = sum(g["replied"] for g in groups)
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "dimension": dimension,
+        "totals": {
+            "sent": total_sent,
+            "replied": total_replied,
+            "response_rate": total_replied / total_sent if total_sent else 0.0,
+        },
+        "groups": groups,
+    }
+
+
+@router.post("/attributions/rebuild")
+def rebuild_reply_attributions(db: Session = Depends(database.get_db)):
+    linked = rebuild_attributions(db)
+    # Only cached analytics depend on attributions; no change event needed.
+    cache.bump("touchpoints", db=db)
+    db.commit()
+    return {"attributed_replies": linked}
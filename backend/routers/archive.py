@@ -0,0 +1,59 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session, joinedload
+
+try:
+    from .. import archive, database, models, schemas
+except ImportError:  # pragma: no cover
+    import archive, database, models, schemas  # type: ignore
+
+router = APIRouter(prefix="/api/archive", tags=["archive"])
+
+
+@router.post("/run")
+def run_archive(older_than_days: int = Query(90, ge=0), db: Session = Depends(database.get_db)):
+    return archive.archive_closed_people(db, older_than_days)
+
+
+@router.get("/people", response_model=List[schemas.Person])
+def read_archived_people(skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
+    entries = (
+        db.query(models.ArchivedPerson)
+        .options(joinedload(models.ArchivedPerson.company))
+        .order_by(models.ArchivedPerson.archived_at.desc(), models.ArchivedPerson.archive_id.desc())
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    return [archive.archived_person_view(entry) for entry in entries]
+
+
+@router.get("/people/{archive_id}", response_model=schemas.Person)
+def read_archived_person(archive_id: int, db: Session = Depends(database.get_db)):
+    entry = (
+        db.query(models.ArchivedPerson)
+        .options(joinedload(models.ArchivedPerson.company))
+        .filter(models.ArchivedPerson.archive_id == archive_id)
+        .first()
+    )
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Archived person not found")
+    return archive.archived_person_view(entry)
+
+
+@router.post("/people/{archive_id}/restore", response_model=schemas.Person)
+def restore_archived_person(archive_id: int, db: Session = Depends(database.get_db)):
+    person = archive.restore_person(db, archive_id)
+    if person is None:
+        raise HTTPException(status_code=404, detail="Archived person not found")
+    return (
+        db.query(models.Person)
+        .options(
+            joinedload(models.Person.company),
+            joinedload(models.Person.touchpoints),
+            joinedload(models.Person.follow_ups),
+        )
+        .filter(models.Person.id == person.id)
+        .first()
+    )
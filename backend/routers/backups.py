@@ -0,0 +1,45 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+
+try:
+    from .. import backup, database, settings
+except ImportError:  # pragma: no cover
+    import backup, database, settings  # type: ignore
+
+router = APIRouter(prefix="/api/backups", tags=["backups"])
+
+
+def _db_path() -> Path:
+    db_path = database.sqlite_path(database.engine)
+    if db_path is None:
+        raise HTTPException(status_code=400, detail="Backups are only supported for file-backed SQLite databases")
+    return db_path
+
+
+@router.get("")
+def backup_status():
+    """Progress of this worker's current or last backup, plus the snapshots on disk."""
+    snapshots = []
+    for path in backup.list_snapshots(_db_path(), Path(settings.BACKUP_DIR)):
+        stat = path.stat()
+        snapshots.append(
+            {
+                "name": path.name,
+                "bytes": stat.st_size,
+                "created_at": datetime.utcfromtimestamp(stat.st_mtime).isoformat(),
+            }
+        )
+    return {"progress": backup.progress(), "snapshots": snapshots}
+
+
+@router.post("", status_code=202)
+def trigger_backup(compress: Optional[bool] = None):
+    """Start a snapshot in the background; poll GET /api/backups for progress."""
+    try:
+        backup.start_backup(_db_path(), compress)
+    except backup.BackupInProgress:
+        raise HTTPException(status_code=409, detail="A backup is already running")
+    return backup.progress()
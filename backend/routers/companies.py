@@ -1,11 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
 from typing import List, Optional
 try:
     from .. import models, schemas, database
+    from ..timeline import timeline_page
 except ImportError:  # pragma: no cover
     import models, schemas, database  # type: ignore
+    from timeline import timeline_page  # type: ignore
 
 router = APIRouter(prefix="/api/companies", tags=["companies"])
 
@@ -65,3 +67,20 @@ def read_companies(db: Session = Depends(database.get_db)):
         ))
         
     return results
+
+
+@router.get("/{company_id}/timeline", response_model=schemas.TimelinePage)
+def read_company_timeline(
+    company_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(database.get_db),
+):
+    """Activity across all of the company's contacts, newest first."""
+    if db.get(models.Company, company_id) is None:
+        raise HTTPException(status_code=404, detail="Company not found")
+    contacts = select(models.Person.id).where(models.Person.company_id == company_id)
+    try:
+        return timeline_page(db, contacts, cursor=cursor, limit=limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -5,8 +5,12 @@ from datetime import date
 from typing import List, Dict
 try:
     from .. import models, schemas, database
+    from ..events import changed
+    from .waitlist import count_due_this_week
 except ImportError:  # pragma: no cover
     import models, schemas, database  # type: ignore
+    from events import changed  # type: ignore
+    from routers.waitlist import count_due_this_week  # type: ignore
 
 router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
 
@@ -37,12 +41,14 @@ def get_today_dashboard(db: Session = Depends(database.get_db)):
         .filter(models.Waitlist.status == "active")
         .count()
     )
+    waitlist_due_this_week = count_due_this_week(db, today)
         
     return {
         "overdue": overdue_tasks,
         "due_today": today_tasks,
         "upcoming": upcoming_tasks,
         "waitlist_count": waitlist_count,
+        "waitlist_due_this_week": waitlist_due_this_week,
     }
 
 @router.post("/tasks/{task_id}/done")
@@ -51,6 +57,7 @@ def mark_task_done(task_id: int, db: Session = Depends(database.get_db)):
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     task.status = "done"
+    changed({"follow_ups": [task_id]}, db)
     db.commit()
     return {"status": "success"}
 
@@ -63,6 +70,7 @@ def snooze_task(task_id: int, days: int = 2, db: Session = Depends(database.get_
     # Simple snooze logic: add days to due_date
     from datetime import timedelta
     task.due_date = task.due_date + timedelta(days=days)
+    changed({"follow_ups": [task_id]}, db)
     db.commit()
     return {"status": "success", "new_date": task.due_date}
 
@@ -75,5 +83,6 @@ def close_task(task_id: int, reason: str, db: Session = Depends(database.get_db)
     task.status = "closed"
     # Ideally verify person is also closed or log the reason?
     # For MVP just close the task.
+    changed({"follow_ups": [task_id]}, db)
     db.commit()
     return {"status": "success"}
@@ -0,0 +1,30 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+try:
+    from .. import database, schemas
+    from ..dedupe import duplicate_clusters, find_matches
+except ImportError:  # pragma: no cover
+    import database, schemas  # type: ignore
+    from dedupe import duplicate_clusters, find_matches  # type: ignore
+
+router = APIRouter(prefix="/api/duplicates", tags=["duplicates"])
+
+
+@router.get("/check", response_model=List[schemas.DuplicateMatch])
+def check_duplicates(
+    name: str,
+    company_name: Optional[str] = None,
+    linkedin_url: Optional[str] = None,
+    exclude_id: Optional[int] = None,
+    db: Session = Depends(database.get_db),
+):
+    """Existing people matching a contact before it is created or edited."""
+    return find_matches(db, name, company_name, linkedin_url, exclude_id=exclude_id)
+
+
+@router.get("/clusters", response_model=List[schemas.DuplicateCluster])
+def read_duplicate_clusters(skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
+    return duplicate_clusters(db)[skip : skip + limit]
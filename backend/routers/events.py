@@ -0,0 +1,43 @@
+import asyncio
+import json
+
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+try:
+    from ..events import broker
+except ImportError:  # pragma: no cover
+    from events import broker  # type: ignore
+
+router = APIRouter(prefix="/api/events", tags=["events"])
+
+# Comment lines keep idle connections (and proxies) from timing out.
+_HEARTBEAT_SECONDS = 15
+
+
+async def _stream(request: Request):
+    queue = await broker.subscribe()
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": ping\n\n"
+                continue
+            name = "resync" if event["table"] == "*" else "change"
+            yield f"event: {name}\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+    finally:
+        broker.unsubscribe(queue)
+
+
+@router.get("")
+async def change_events(request: Request):
+    """Server-sent `change` events: {"table", "ids", "version"} per committed write."""
+    return StreamingResponse(
+        _stream(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,32 @@
+import os
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+try:
+    from .. import database, lifecycle
+except ImportError:  # pragma: no cover
+    import database, lifecycle  # type: ignore
+
+router = APIRouter(prefix="/api/health", tags=["health"])
+
+
+@router.get("")
+def liveness():
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+def readiness():
+    state = lifecycle.status()
+    return JSONResponse(state, status_code=200 if state["ready"] else 503)
+
+
+@router.get("/db")
+def database_health():
+    """Per-process database counters; each worker reports its own."""
+    return {
+        "dialect": database.engine.dialect.name,
+        "pid": os.getpid(),
+        "busy_errors": database.busy_error_count(),
+    }
@@ -1,20 +1,30 @@
 from datetime import date, timedelta
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session, joinedload
 
 try:
-    from .. import database, models, schemas
+    from .. import archive, database, models, schemas
+    from ..events import changed
+    from ..attribution import record_touchpoint
+    from ..contact_fields import people_with_channel, people_with_link_domain, sync_person_fields
+    from ..dedupe import apply_person_keys, find_matches
+    from ..timeline import timeline_page
     from ..status import (
+        apply_touchpoint_derived_fields,
         close_person,
-        infer_direction,
         normalize_token,
         outcome_is_closed,
     )
 except ImportError:  # pragma: no cover
-    import database, models, schemas  # type: ignore
-    from status import close_person, infer_direction, normalize_token, outcome_is_closed  # type: ignore
+    import archive, database, models, schemas  # type: ignore
+    from events import changed  # type: ignore
+    from attribution import record_touchpoint  # type: ignore
+    from contact_fields import people_with_channel, people_with_link_domain, sync_person_fields  # type: ignore
+    from dedupe import apply_person_keys, find_matches  # type: ignore
+    from timeline import timeline_page  # type: ignore
+    from status import apply_touchpoint_derived_fields, close_person, normalize_token, outcome_is_closed  # type: ignore
 
 router = APIRouter(prefix="/api/people", tags=["people"])
 
@@ -22,14 +32,25 @@ router = APIRouter(prefix="/api/people", tags=["people"])
 @router.post("", response_model=schemas.Person)
 def create_person(person: schemas.PersonCreate, db: Session = Depends(database.get_db)):
     company_name = person.company_name.strip()
+    if person.linkedin_url and not person.allow_duplicate:
+        same_profile = [
+            match
+            for match in find_matches(db, person.name, company_name, person.linkedin_url)
+            if "linkedin" in match["reasons"]
+        ]
+        if same_profile:
+            raise HTTPException(
+                status_code=409,
+                detail={"message": "A person with this LinkedIn profile already exists", "matches": same_profile},
+            )
+
     db_company = (
         db.query(models.Company).filter(models.Company.name == company_name).first()
     )
     if not db_company:
         db_company = models.Company(name=company_name, sponsor_status="unknown")
         db.add(db_company)
-        db.commit()
-        db.refresh(db_company)
+        db.flush()
 
     db_person = models.Person(
         company_id=db_company.id,
@@ -43,9 +64,10 @@ def create_person(person: schemas.PersonCreate, db: Session = Depends(database.g
         outreach_channels=person.outreach_channels,
         links=person.links,
     )
+    apply_person_keys(db_person, db_company.name)
+    sync_person_fields(db_person)
     db.add(db_person)
-    db.commit()
-    db.refresh(db_person)
+    db.flush()
 
     if person.create_initial_followup:
         days = person.initial_followup_days if person.initial_followup_days else 2
@@ -55,8 +77,10 @@ def create_person(person: schemas.PersonCreate, db: Session = Depends(database.g
             action="Follow Up",
         )
         db.add(follow_up)
-        db.commit()
 
+    changed({"people": [db_person.id], "companies": [db_company.id], "follow_ups": None}, db)
+    db.commit()
+    db.refresh(db_person)
     return db_person
 
 
@@ -67,6 +91,7 @@ def delete_person(person_id: int, db: Session = Depends(database.get_db)):
         raise HTTPException(status_code=404, detail="Person not found")
 
     db.delete(person)
+    changed({"people": [person_id], "touchpoints": None, "follow_ups": None}, db)
     db.commit()
     return {"ok": True}
 
@@ -100,6 +125,8 @@ def update_person(
         db_person.outreach_channels = person_update.outreach_channels
     if person_update.links is not None:
         db_person.links = person_update.links
+    if person_update.outreach_channels is not None or person_update.links is not None:
+        sync_person_fields(db_person)
     if person_update.status is not None:
         db_person.status = person_update.status
     if person_update.linkedin_url is not None:
@@ -119,13 +146,18 @@ def update_person(
         if not db_company:
             db_company = models.Company(name=company_name, sponsor_status="unknown")
             db.add(db_company)
-            db.commit()
-            db.refresh(db_company)
+            db.flush()
         db_person.company_id = db_company.id
+        apply_person_keys(db_person, db_company.name)
+    else:
+        apply_person_keys(db_person, db_person.company.name)
 
     if person_update.status is not None and normalize_token(person_update.status) == "closed":
         close_person(db_person, db)
+    elif person_update.status is not None:
+        db_person.closed_at = None
 
+    changed({"people": [person_id], "companies": [db_person.company_id], "follow_ups": None}, db)
     db.commit()
 
     updated = (
@@ -142,10 +174,21 @@ def update_person(
 
 
 @router.get("", response_model=List[schemas.Person])
-def read_people(skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
+def read_people(
+    skip: int = 0,
+    limit: int = 100,
+    include_archived: bool = False,
+    channel: Optional[str] = None,
+    link_domain: Optional[str] = None,
+    db: Session = Depends(database.get_db),
+):
+    query = db.query(models.Person)
+    if channel:
+        query = query.filter(models.Person.id.in_(people_with_channel(channel)))
+    if link_domain:
+        query = query.filter(models.Person.id.in_(people_with_link_domain(link_domain)))
     people = (
-        db.query(models.Person)
-        .options(
+        query.options(
             joinedload(models.Person.company),
             joinedload(models.Person.touchpoints),
             joinedload(models.Person.follow_ups),
@@ -154,7 +197,21 @@ def read_people(skip: int = 0, limit: int = 100, db: Session = Depends(database.
         .limit(limit)
         .all()
     )
-    return people
+    # Archived snapshots are not indexed by channel or link.
+    if not include_archived or channel or link_domain or len(people) == limit:
+        return people
+
+    # Archived people page in after every active one.
+    archived_skip = max(skip - db.query(models.Person.id).count(), 0)
+    entries = (
+        db.query(models.ArchivedPerson)
+        .options(joinedload(models.ArchivedPerson.company))
+        .order_by(models.ArchivedPerson.archive_id)
+        .offset(archived_skip)
+        .limit(limit - len(people))
+        .all()
+    )
+    return people + [archive.archived_person_view(entry) for entry in entries]
 
 
 @router.get("/{person_id}", response_model=schemas.Person)
@@ -174,6 +231,22 @@ def read_person(person_id: int, db: Session = Depends(database.get_db)):
     return person
 
 
+@router.get("/{person_id}/timeline", response_model=schemas.TimelinePage)
+def read_person_timeline(
+    person_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(database.get_db),
+):
+    """Touchpoints and follow-ups, newest first; pass `next_cursor` back for the next page."""
+    if db.get(models.Person, person_id) is None:
+        raise HTTPException(status_code=404, detail="Person not found")
+    try:
+        return timeline_page(db, [person_id], cursor=cursor, limit=limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.post("/{person_id}/touchpoints", response_model=schemas.Touchpoint)
 def add_touchpoint(
     person_id: int, touchpoint: schemas.TouchpointCreate, db: Session = Depends(database.get_db)
@@ -183,13 +256,13 @@ def add_touchpoint(
         raise HTTPException(status_code=404, detail="Person not found")
 
     db_touchpoint = models.Touchpoint(
-        **{
-            **touchpoint.model_dump(exclude={"next_step_date"}),
-            "direction": infer_direction(touchpoint.direction, touchpoint.outcome),
-        },
+        **touchpoint.model_dump(exclude={"next_step_date"}),
         person_id=person_id,
     )
+    apply_touchpoint_derived_fields(db_touchpoint)
     db.add(db_touchpoint)
+    db.flush()
+    record_touchpoint(db, db_touchpoint)
 
     outcome = normalize_token(touchpoint.outcome)
     if outcome_is_closed(outcome):
@@ -205,6 +278,7 @@ def add_touchpoint(
         )
         db.add(db_followup)
 
+    changed({"touchpoints": [db_touchpoint.id], "people": [person_id], "follow_ups": None}, db)
     db.commit()
     db.refresh(db_touchpoint)
     return db_touchpoint
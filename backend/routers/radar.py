@@ -1,61 +1,82 @@
-from fastapi import APIRouter
-import feedparser
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
 from typing import List, Optional
 from pydantic import BaseModel
-from datetime import datetime, timedelta, timezone
-import calendar
-from urllib.parse import quote_plus
+from datetime import date, datetime, timedelta
+
+try:
+    from .. import database, news
+    from ..company_matcher import get_matcher, match_text
+except ImportError:  # pragma: no cover
+    import database, news  # type: ignore
+    from company_matcher import get_matcher, match_text  # type: ignore
 
 router = APIRouter(prefix="/api/radar", tags=["radar"])
 
 class NewsItem(BaseModel):
+    id: int
     title: str
     link: str
     source: str
     published: str
     snippet: str
+    matched_company_ids: List[int] = []
+    matched_waitlist_ids: List[int] = []
 
 @router.get("", response_model=List[NewsItem])
-def get_radar_news(query: str = "H-1B sponsor hiring", days: int = 2, limit: int = 20):
-    # Google News RSS URL
-    safe_query_text = (query or "").strip() or "H-1B sponsor hiring"
-    days = max(1, min(int(days), 30))
-    limit = max(1, min(int(limit), 50))
-
-    # Bias results to recent items. Google News supports 'when:Xd' in the query.
-    safe_query = quote_plus(f"{safe_query_text} when:{days}d")
-    rss_url = (
-        f"https://news.google.com/rss/search?q={safe_query}&hl=en-US&gl=US&ceid=US:en"
-    )
-    feed = feedparser.parse(rss_url)
-    
-    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
-    parsed_items: list[tuple[datetime, NewsItem]] = []
+def get_radar_news(
+    query: str = news.DEFAULT_QUERY,
+    days: int = 2,
+    limit: int = 20,
+    source: Optional[str] = None,
+    q: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    tracked_only: bool = False,
+    db: Session = Depends(database.get_db),
+):
+    """
+    Articles for `query` from the local archive. `days` limits to recent items
+    unless an explicit `date_from`/`date_to` range is given; `q` searches
+    titles and snippets. Each item lists the tracked companies and waitlist
+    entries it mentions; `tracked_only` keeps just those items. A query not
+    seen before comes back empty until the ingester's next pass fetches it.
+    """
+    query = news.normalize_query(query)
+    limit = max(1, min(int(limit), 200))
+    news.mark_requested(db, query)
 
-    for entry in getattr(feed, "entries", [])[: 5 * limit]:
-        published_dt: Optional[datetime] = None
-        if hasattr(entry, "published_parsed") and entry.published_parsed:
-            published_dt = datetime.fromtimestamp(
-                calendar.timegm(entry.published_parsed), tz=timezone.utc
-            )
+    if date_from is None and date_to is None:
+        since = datetime.utcnow() - timedelta(days=max(1, min(int(days), 365)))
+        until = None
+    else:
+        since = datetime.combine(date_from, datetime.min.time()) if date_from else None
+        until = datetime.combine(date_to + timedelta(days=1), datetime.min.time()) if date_to else None
 
-        if published_dt is None or published_dt < cutoff:
+    matcher = get_matcher(db)
+    results: list[NewsItem] = []
+    for item in news.search(db, query=query, since=since, until=until, source=source, text=q).yield_per(200):
+        matches = match_text(matcher, item.title, item.snippet)
+        if tracked_only and not (matches["company"] or matches["waitlist"]):
             continue
-
-        parsed_items.append(
-            (
-                published_dt,
-                NewsItem(
-                    title=getattr(entry, "title", ""),
-                    link=getattr(entry, "link", ""),
-                    source=entry.source.title
-                    if hasattr(entry, "source") and hasattr(entry.source, "title")
-                    else "Unknown",
-                    published=getattr(entry, "published", ""),
-                    snippet=getattr(entry, "summary", ""),
-                ),
+        results.append(
+            NewsItem(
+                id=item.id,
+                title=item.title,
+                link=item.link,
+                source=item.source or "Unknown",
+                published=item.published or "",
+                snippet=item.snippet or "",
+                matched_company_ids=matches["company"],
+                matched_waitlist_ids=matches["waitlist"],
             )
         )
+        if len(results) >= limit:
+            break
+    return results
 
-    parsed_items.sort(key=lambda x: x[0], reverse=True)
-    return [item for _, item in parsed_items[:limit]]
+@router.post("/ingest")
+def ingest_radar_news(query: Optional[str] = None, db: Session = Depends(database.get_db)):
+    """Fetch now instead of waiting for the background job."""
+    queries = [query] if query else news.tracked_queries(db)
+    return {news.normalize_query(q): news.ingest_query(db, q) for q in queries}
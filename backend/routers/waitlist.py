@@ -1,12 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Query, Session
+from typing import List, Optional
 from pydantic import BaseModel
-from datetime import date
+from datetime import date, timedelta
 try:
     from .. import models, schemas, database
+    from ..contact_fields import sync_waitlist_fields, waitlist_with_channel, waitlist_with_link_domain
+    from ..events import changed
 except ImportError:  # pragma: no cover
     import models, schemas, database  # type: ignore
+    from contact_fields import sync_waitlist_fields, waitlist_with_channel, waitlist_with_link_domain  # type: ignore
+    from events import changed  # type: ignore
 
 router = APIRouter(prefix="/api/waitlist", tags=["waitlist"])
 
@@ -16,6 +21,8 @@ class WaitlistItemCreate(BaseModel):
     priority: str = "B"
     reason: str | None = None
     planned_action_date: date | None = None
+    outreach_channels: str | None = None
+    links: str | None = None
 
 class WaitlistItem(WaitlistItemCreate):
     id: int
@@ -24,14 +31,148 @@ class WaitlistItem(WaitlistItemCreate):
     class Config:
         from_attributes = True
 
+class WaitlistPage(BaseModel):
+    items: List[WaitlistItem]
+    next_cursor: Optional[str] = None
+
+
+def _filtered_waitlist(
+    db: Session,
+    priority: Optional[str] = None,
+    company: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    channel: Optional[str] = None,
+    link_domain: Optional[str] = None,
+) -> Query:
+    query = db.query(models.Waitlist).filter(models.Waitlist.status == "active")
+    if priority:
+        query = query.filter(models.Waitlist.priority == priority.strip().upper())
+    if company and company.strip():
+        # Matches the `ix_waitlist_company_lower` expression index.
+        query = query.filter(func.lower(models.Waitlist.company) == company.strip().lower())
+    if date_from is not None:
+        query = query.filter(models.Waitlist.planned_action_date >= date_from)
+    if date_to is not None:
+        query = query.filter(models.Waitlist.planned_action_date <= date_to)
+    if channel and channel.strip():
+        query = query.filter(models.Waitlist.id.in_(waitlist_with_channel(channel)))
+    if link_domain and link_domain.strip():
+        query = query.filter(models.Waitlist.id.in_(waitlist_with_link_domain(link_domain)))
+    return query
+
+
+def _prioritized(query: Query) -> Query:
+    # Same column order as `ix_waitlist_status_priority_date`; missing
+    # priorities and undated items sort first, which is also how SQLite's
+    # index stores them.
+    return query.order_by(
+        models.Waitlist.priority.asc().nulls_first(),
+        models.Waitlist.planned_action_date.asc().nulls_first(),
+        models.Waitlist.id.asc(),
+    )
+
+
+def _encode_cursor(item: models.Waitlist) -> str:
+    # NULL is encoded as an empty field; `add_waitlist_item` never stores "".
+    planned = item.planned_action_date.isoformat() if item.planned_action_date else ""
+    return f"{item.priority or ''}|{planned}|{item.id}"
+
+
+def _after_nullable(column, last_value, then):
+    """Rows after `last_value` for a NULLS FIRST ascending column; `then` breaks ties."""
+    if last_value is None:
+        return or_(and_(column.is_(None), then), column.isnot(None))
+    return or_(column > last_value, and_(column == last_value, then))
+
+
+def _after_cursor(query: Query, cursor: str) -> Query:
+    try:
+        priority, planned, item_id = cursor.rsplit("|", 2)
+        last_id = int(item_id)
+        last_date = date.fromisoformat(planned) if planned else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    w = models.Waitlist
+    same_priority_after = _after_nullable(w.planned_action_date, last_date, w.id > last_id)
+    return query.filter(_after_nullable(w.priority, priority or None, same_priority_after))
+
+
+def _week_bounds(today: date) -> tuple[date, date]:
+    monday = today - timedelta(days=today.weekday())
+    return monday, monday + timedelta(days=6)
+
+
+def count_due_this_week(db: Session, today: Optional[date] = None) -> int:
+    _, sunday = _week_bounds(today or date.today())
+    return _filtered_waitlist(db, date_to=sunday).count()
+
+
 @router.get("", response_model=List[WaitlistItem])
-def get_waitlist(db: Session = Depends(database.get_db)):
-    return db.query(models.Waitlist).filter(models.Waitlist.status == "active").all()
+def get_waitlist(
+    priority: Optional[str] = None,
+    company: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    channel: Optional[str] = None,
+    link_domain: Optional[str] = None,
+    db: Session = Depends(database.get_db),
+):
+    return _prioritized(
+        _filtered_waitlist(db, priority, company, date_from, date_to, channel, link_domain)
+    ).all()
+
+@router.get("/page", response_model=WaitlistPage)
+def get_waitlist_page(
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    priority: Optional[str] = None,
+    company: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    channel: Optional[str] = None,
+    link_domain: Optional[str] = None,
+    db: Session = Depends(database.get_db),
+):
+    limit = max(1, min(int(limit), 200))
+    query = _filtered_waitlist(db, priority, company, date_from, date_to, channel, link_domain)
+    if cursor:
+        query = _after_cursor(query, cursor)
+
+    # Fetch one extra row to know whether another page exists.
+    rows = _prioritized(query).limit(limit + 1).all()
+    items = rows[:limit]
+    next_cursor = _encode_cursor(items[-1]) if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+@router.get("/due", response_model=List[WaitlistItem])
+def get_waitlist_due_this_week(
+    include_overdue: bool = True,
+    priority: Optional[str] = None,
+    db: Session = Depends(database.get_db),
+):
+    monday, sunday = _week_bounds(date.today())
+    query = _filtered_waitlist(
+        db,
+        priority=priority,
+        date_from=None if include_overdue else monday,
+        date_to=sunday,
+    )
+    return query.order_by(
+        models.Waitlist.planned_action_date.asc(),
+        models.Waitlist.priority.asc(),
+        models.Waitlist.id.asc(),
+    ).all()
 
 @router.post("", response_model=WaitlistItem)
 def add_waitlist_item(item: WaitlistItemCreate, db: Session = Depends(database.get_db)):
     db_item = models.Waitlist(**item.model_dump())
+    db_item.priority = (db_item.priority or "").strip() or "B"
+    sync_waitlist_fields(db_item)
     db.add(db_item)
+    db.flush()
+    changed({"waitlist": [db_item.id]}, db)
     db.commit()
     db.refresh(db_item)
     return db_item
@@ -46,6 +187,7 @@ def convert_to_contact(item_id: int, db: Session = Depends(database.get_db)):
         raise HTTPException(status_code=404, detail="Item not found")
         
     item.status = "converted"
+    changed({"waitlist": [item_id]}, db)
     db.commit()
     return {"message": "Marked as converted"}
 
@@ -56,5 +198,6 @@ def delete_waitlist_item(item_id: int, db: Session = Depends(database.get_db)):
         raise HTTPException(status_code=404, detail="Item not found")
         
     db.delete(item)
+    changed({"waitlist": [item_id]}, db)
     db.commit()
     return {"ok": True}
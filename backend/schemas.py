@@ -78,6 +78,7 @@ class PersonCreate(PersonBase):
     company_name: str  # Handle company creation/linking in logic
     create_initial_followup: Optional[bool] = False # Flag for creating initial follow-up
     initial_followup_days: Optional[int] = 2
+    allow_duplicate: Optional[bool] = False # Skip the LinkedIn duplicate check
 
 class PersonUpdate(BaseModel):
     name: Optional[str] = None
@@ -98,5 +99,34 @@ class Person(PersonBase):
     company: Company
     touchpoints: List[Touchpoint] = []
     follow_ups: List[FollowUp] = []
+    archived: bool = False  # served from people_archive
+    archive_id: Optional[int] = None  # key for archive reads and restores
     
     model_config = ConfigDict(from_attributes=True)
+
+# --- Duplicates ---
+class DuplicateMatch(BaseModel):
+    id: int
+    name: str
+    reasons: List[str]
+
+class DuplicateCluster(BaseModel):
+    person_ids: List[int]
+    reasons: List[str]
+
+class TimelineEntry(BaseModel):
+    kind: str  # 'touchpoint' or 'follow_up'
+    id: int
+    at: datetime  # touchpoint date, or follow-up due date at midnight
+    person_id: int
+    person_name: str
+    channel: Optional[str] = None
+    outcome: Optional[str] = None
+    direction: Optional[str] = None
+    message_preview: Optional[str] = None
+    action: Optional[str] = None  # next step, or the follow-up's action
+    status: Optional[str] = None  # follow-ups only
+
+class TimelinePage(BaseModel):
+    items: List[TimelineEntry]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,124 @@
+"""
+In-memory manifest of the built frontend (`frontend/dist`).
+
+Files are read once, compressed ahead of time for every available encoding,
+and served from memory with strong ETags, so a page load costs no filesystem
+stats or per-request compression. Vite fingerprints everything under
+`assets/`, which makes those responses safe to cache forever.
+"""
+from __future__ import annotations
+
+import hashlib
+import mimetypes
+import threading
+from pathlib import Path
+from typing import Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    from .compression import ENCODERS, negotiate
+except ImportError:  # pragma: no cover
+    from compression import ENCODERS, negotiate  # type: ignore
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+SHORT = "public, max-age=3600"
+
+_MIN_COMPRESS_BYTES = 512
+_COMPRESSIBLE_TYPES = {
+    "application/javascript",
+    "application/json",
+    "application/manifest+json",
+    "application/xml",
+    "image/svg+xml",
+    "text/javascript",
+}
+# Variants emitted by a build-time compression plugin, if any.
+_PREBUILT_SUFFIXES = {".br": "br", ".gz": "gzip"}
+
+
+def _is_compressible(media_type: str) -> bool:
+    return media_type.startswith("text/") or media_type in _COMPRESSIBLE_TYPES
+
+
+class StaticAsset:
+    __slots__ = ("media_type", "etag", "cache_control", "bodies")
+
+    def __init__(self, media_type: str, etag: str, cache_control: str, bodies: dict[str, bytes]) -> None:
+        self.media_type = media_type
+        self.etag = etag
+        self.cache_control = cache_control
+        self.bodies = bodies  # "identity" plus any worthwhile encodings
+
+    def response(self, request: Request) -> Response:
+        encodings = [coding for coding in self.bodies if coding != "identity"]
+        coding = negotiate(request.headers.get("accept-encoding"), encodings)
+        etag = self.etag if coding is None else f'{self.etag[:-1]}-{coding}"'
+        headers = {"ETag": etag, "Cache-Control": self.cache_control}
+        if encodings:
+            headers["Vary"] = "Accept-Encoding"
+
+        if etag in {tag.strip() for tag in request.headers.get("if-none-match", "").split(",")}:
+            return Response(status_code=304, headers=headers)
+        if coding is not None:
+            headers["Content-Encoding"] = coding
+        return Response(self.bodies[coding or "identity"], media_type=self.media_type, headers=headers)
+
+
+def _cache_control(rel_path: str) -> str:
+    if rel_path.startswith("assets/"):
+        return IMMUTABLE
+    if rel_path.endswith(".html"):
+        return REVALIDATE
+    return SHORT
+
+
+def _load_asset(path: Path, rel_path: str) -> StaticAsset:
+    data = path.read_bytes()
+    media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    if media_type.startswith("text/") or media_type == "application/javascript":
+        media_type += "; charset=utf-8"
+
+    bodies = {"identity": data}
+    if len(data) >= _MIN_COMPRESS_BYTES and _is_compressible(media_type.split(";")[0]):
+        for suffix, coding in _PREBUILT_SUFFIXES.items():
+            prebuilt = path.with_name(path.name + suffix)
+            if prebuilt.is_file():
+                bodies[coding] = prebuilt.read_bytes()
+        for coding, encode in ENCODERS.items():
+            if coding not in bodies:
+                bodies[coding] = encode(data)
+        # Keep only encodings that actually save bytes.
+        bodies = {c: b for c, b in bodies.items() if c == "identity" or len(b) < len(data) * 0.9}
+
+    etag = '"' + hashlib.sha256(data).hexdigest()[:20] + '"'
+    return StaticAsset(media_type, etag, _cache_control(rel_path), bodies)
+
+
+class StaticManifest:
+    """All files below `root`, keyed by their URL path relative to it."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._assets: Optional[dict[str, StaticAsset]] = None
+        self._lock = threading.Lock()
+
+    def load(self) -> int:
+        assets = {}
+        for path in sorted(self.root.rglob("*")):
+            if not path.is_file():
+                continue
+            if path.suffix in _PREBUILT_SUFFIXES and path.with_suffix("").is_file():
+                continue
+            rel_path = path.relative_to(self.root).as_posix()
+            assets[rel_path] = _load_asset(path, rel_path)
+        with self._lock:
+            self._assets = assets
+        return len(assets)
+
+    def get(self, rel_path: str) -> Optional[StaticAsset]:
+        if self._assets is None:
+            self.load()
+        return self._assets.get(rel_path)
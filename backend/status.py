@@ -1,14 +1,19 @@
 from __future__ import annotations
 
+from datetime import date, datetime, timezone
 from typing import Optional
 
-from sqlalchemy import func
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
 try:
-    from . import models
+    from . import models, settings
+    from .events import changed
+    from .meta import get_meta, set_meta
 except ImportError:  # pragma: no cover
-    import models  # type: ignore
+    import models, settings  # type: ignore
+    from events import changed  # type: ignore
+    from meta import get_meta, set_meta  # type: ignore
 
 
 def normalize_token(value: Optional[str]) -> str:
@@ -56,8 +61,34 @@ def infer_direction(value: Optional[str], outcome: Optional[str]) -> str:
     return "other"
 
 
+def as_naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def local_day_for(value: Optional[datetime]) -> date:
+    """Calendar day of a naive-UTC timestamp in the reporting timezone."""
+    value = value or datetime.utcnow()
+    return value.replace(tzinfo=timezone.utc).astimezone(settings.reporting_zone()).date()
+
+
+def apply_touchpoint_derived_fields(touchpoint: models.Touchpoint) -> None:
+    """Fill the normalized columns analytics and reconciliation filter on."""
+    # Stored dates are naive UTC; an aware client timestamp would otherwise
+    # lose its offset on SQLite.
+    if touchpoint.date is not None:
+        touchpoint.date = as_naive_utc(touchpoint.date)
+    touchpoint.direction = infer_direction(touchpoint.direction, touchpoint.outcome)
+    touchpoint.outcome_token = normalize_token(touchpoint.outcome)
+    touchpoint.is_closing = outcome_is_closed(touchpoint.outcome)
+    touchpoint.local_day = local_day_for(touchpoint.date)
+
+
 def close_person(person: models.Person, db: Session) -> None:
     person.status = "closed"
+    if person.closed_at is None:
+        person.closed_at = datetime.utcnow()
     for follow_up in (
         db.query(models.FollowUp)
         .filter(models.FollowUp.person_id == person.id, models.FollowUp.status == "open")
@@ -75,17 +106,11 @@ def reconcile_people_statuses(db: Session) -> int:
 
     updated_count = 0
 
-    outcome_lower = func.lower(func.coalesce(models.Touchpoint.outcome, ""))
     closed_from_touchpoints = {
         person_id
         for (person_id,) in (
             db.query(models.Touchpoint.person_id)
-            .filter(
-                (outcome_lower == "closed")
-                | (outcome_lower == "not_interested")
-                | (outcome_lower.like("closed%"))
-                | (outcome_lower.like("%not interested%"))
-            )
+            .filter(models.Touchpoint.is_closing.is_(True))
             .distinct()
             .all()
         )
@@ -109,13 +134,41 @@ def reconcile_people_statuses(db: Session) -> int:
     return updated_count
 
 
-def backfill_touchpoint_directions(db: Session) -> int:
+def backfill_touchpoint_derived_fields(db: Session) -> int:
+    """Populate derived touchpoint columns for rows written before they existed."""
     updated = 0
-    for tp in db.query(models.Touchpoint).all():
-        desired = infer_direction(tp.direction, tp.outcome)
-        if normalize_direction(tp.direction) != desired:
-            tp.direction = desired
-            updated += 1
+    for tp in (
+        db.query(models.Touchpoint)
+        .filter(
+            or_(
+                models.Touchpoint.outcome_token.is_(None),
+                models.Touchpoint.is_closing.is_(None),
+                models.Touchpoint.local_day.is_(None),
+            )
+        )
+        .yield_per(1000)
+    ):
+        apply_touchpoint_derived_fields(tp)
+        updated += 1
+
+    set_meta(db, "reporting_timezone", settings.REPORTING_TIMEZONE)
+    db.commit()
+    return updated
+
+
+def sync_reporting_timezone(db: Session) -> int:
+    """Re-bucket `local_day` when the reporting timezone setting changed."""
+    if get_meta(db, "reporting_timezone") == settings.REPORTING_TIMEZONE:
+        return 0
+
+    updated = 0
+    for tp in db.query(models.Touchpoint).yield_per(1000):
+        tp.local_day = local_day_for(tp.date)
+        updated += 1
+
+    set_meta(db, "reporting_timezone", settings.REPORTING_TIMEZONE)
     if updated:
-        db.commit()
+        # Weekly analytics are cached per touchpoints version.
+        changed({"touchpoints": None}, db)
+    db.commit()
     return updated
@@ -0,0 +1,139 @@
+"""
+Activity timeline for a person or a company.
+
+Touchpoints and follow-ups are merged newest first with one UNION ALL query
+and paged by a `(at, kind, id)` keyset. Each side is limited to a page on its
+own `(person_id, date)` index before the merge, so a page costs the same no
+matter how long the relationship has run.
+"""
+from __future__ import annotations
+
+from datetime import datetime, time
+from typing import Optional
+
+from sqlalchemy import DateTime, String, and_, false, literal, null, or_, select, true, union_all
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import FunctionElement
+
+try:
+    from . import models
+except ImportError:  # pragma: no cover
+    import models  # type: ignore
+
+TOUCHPOINT = "touchpoint"
+FOLLOW_UP = "follow_up"
+
+
+class date_as_timestamp(FunctionElement):
+    """A DATE column as a timestamp at midnight, comparable with DateTime columns."""
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(date_as_timestamp)
+def _date_as_timestamp(element, compiler, **kw):
+    return "CAST(%s AS TIMESTAMP)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(date_as_timestamp, "sqlite")
+def _date_as_timestamp_sqlite(element, compiler, **kw):
+    # Same text layout SQLAlchemy stores DateTime values in, so the two sort
+    # and compare correctly as strings.
+    return "(%s || ' 00:00:00.000000')" % compiler.process(element.clauses, **kw)
+
+
+def encode_cursor(at: datetime, kind: str, item_id: int) -> str:
+    return f"{at.isoformat()}|{kind}|{item_id}"
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str, int]:
+    """Raises ValueError for anything `encode_cursor` didn't produce."""
+    at, kind, item_id = cursor.rsplit("|", 2)
+    if kind not in (TOUCHPOINT, FOLLOW_UP):
+        raise ValueError(f"unknown kind {kind!r}")
+    return datetime.fromisoformat(at), kind, int(item_id)
+
+
+def _before(kind: str, at_lt, at_eq, id_column, cursor: tuple[datetime, str, int]):
+    # (at, kind, id) < cursor, with `kind` fixed for this side of the union.
+    _, last_kind, last_id = cursor
+    if kind < last_kind:
+        tie = true()
+    elif kind == last_kind:
+        tie = id_column < last_id
+    else:
+        tie = false()
+    return or_(at_lt, and_(at_eq, tie))
+
+
+def _touchpoints(person_ids, cursor, size: int):
+    tp = models.Touchpoint
+    query = select(
+        tp.date.label("at"),
+        literal(TOUCHPOINT, String).label("kind"),
+        tp.id.label("id"),
+        tp.person_id.label("person_id"),
+        tp.channel.label("channel"),
+        tp.outcome.label("outcome"),
+        tp.direction.label("direction"),
+        tp.message_preview.label("message_preview"),
+        tp.next_step_action.label("action"),
+        null().label("status"),
+    ).where(tp.person_id.in_(person_ids), tp.date.isnot(None))
+    if cursor is not None:
+        last_at = cursor[0]
+        query = query.where(_before(TOUCHPOINT, tp.date < last_at, tp.date == last_at, tp.id, cursor))
+    return query.order_by(tp.date.desc(), tp.id.desc()).limit(size).subquery()
+
+
+def _follow_ups(person_ids, cursor, size: int):
+    fu = models.FollowUp
+    query = select(
+        date_as_timestamp(fu.due_date).label("at"),
+        literal(FOLLOW_UP, String).label("kind"),
+        fu.id.label("id"),
+        fu.person_id.label("person_id"),
+        null().label("channel"),
+        null().label("outcome"),
+        null().label("direction"),
+        null().label("message_preview"),
+        fu.action.label("action"),
+        fu.status.label("status"),
+    ).where(fu.person_id.in_(person_ids))
+    if cursor is not None:
+        # Compared on the raw due_date so `(person_id, due_date)` stays usable.
+        last_at = cursor[0]
+        last_day = last_at.date()
+        if last_at.time() == time.min:
+            at_lt, at_eq = fu.due_date < last_day, fu.due_date == last_day
+        else:
+            at_lt, at_eq = fu.due_date <= last_day, false()
+        query = query.where(_before(FOLLOW_UP, at_lt, at_eq, fu.id, cursor))
+    return query.order_by(fu.due_date.desc(), fu.id.desc()).limit(size).subquery()
+
+
+def timeline_page(db: Session, person_ids, cursor: Optional[str] = None, limit: int = 50) -> dict:
+    """
+    One page of the merged timeline for `person_ids` (a list or a select of
+    ids), newest first. Raises ValueError for a malformed cursor.
+    """
+    position = decode_cursor(cursor) if cursor else None
+    size = limit + 1
+    merged = union_all(
+        *(select(side) for side in (_touchpoints(person_ids, position, size), _follow_ups(person_ids, position, size)))
+    ).subquery()
+    rows = db.execute(
+        select(merged, models.Person.name.label("person_name"))
+        .join(models.Person, models.Person.id == merged.c.person_id)
+        .order_by(merged.c.at.desc(), merged.c.kind.desc(), merged.c.id.desc())
+        .limit(size)
+    ).mappings().all()
+
+    items = [dict(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last["at"], last["kind"], last["id"])
+    return {"items": items, "next_cursor": next_cursor}
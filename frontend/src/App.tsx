@@ -9,7 +9,10 @@ import WaitlistPage from "./pages/WaitlistPage";
 import RadarPage from "./pages/RadarPage";
 import AnalyticsPage from "./pages/AnalyticsPage";
 
-const queryClient = new QueryClient();
+// Freshness comes from server-sent change events (see useChangeEvents).
+const queryClient = new QueryClient({
+  defaultOptions: { queries: { refetchOnWindowFocus: false } },
+});
 
 function App() {
   return (
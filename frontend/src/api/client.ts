@@ -57,3 +57,9 @@ export interface FollowUp {
   action: string;
   status: string;
 }
+
+export interface DuplicateMatch {
+  id: number;
+  name: string;
+  reasons: string[];
+}
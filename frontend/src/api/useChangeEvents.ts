@@ -0,0 +1,57 @@
+import { useEffect } from "react";
+import { useQueryClient } from "@tanstack/react-query";
+import type { QueryKey } from "@tanstack/react-query";
+
+interface ChangeEvent {
+  table: string;
+  ids: number[] | null;
+  version: number | null;
+}
+
+// Queries whose data is derived from each backend table.
+const AFFECTED: Record<string, QueryKey[]> = {
+  people: [["people"], ["companies"], ["dashboard"]],
+  touchpoints: [["people"], ["person"], ["dashboard"], ["analytics-weekly"]],
+  companies: [["companies"], ["radar"]],
+  follow_ups: [["dashboard"], ["people"], ["person"]],
+  waitlist: [["waitlist"], ["dashboard"], ["radar"]],
+  news_items: [["radar"]],
+};
+
+/**
+ * Subscribe to /api/events and invalidate only the queries a committed write
+ * affects, instead of refetching everything on focus.
+ */
+export function useChangeEvents() {
+  const queryClient = useQueryClient();
+
+  useEffect(() => {
+    const source = new EventSource("/api/events");
+    let dropped = false;
+
+    source.addEventListener("change", (message) => {
+      const event = JSON.parse((message as MessageEvent).data) as ChangeEvent;
+      for (const queryKey of AFFECTED[event.table] ?? []) {
+        queryClient.invalidateQueries({ queryKey });
+      }
+      if (event.table === "people" && event.ids) {
+        for (const id of event.ids) {
+          queryClient.invalidateQueries({ queryKey: ["person", String(id)] });
+        }
+      }
+    });
+    // Sent when we fell behind; anything may have changed.
+    source.addEventListener("resync", () => queryClient.invalidateQueries());
+
+    source.onerror = () => {
+      dropped = true;
+    };
+    source.onopen = () => {
+      // Events were missed while disconnected.
+      if (dropped) queryClient.invalidateQueries();
+      dropped = false;
+    };
+
+    return () => source.close();
+  }, [queryClient]);
+}
@@ -1,8 +1,10 @@
 import React, { useState } from "react";
 import { NavLink, Outlet } from "react-router-dom";
 import { useMutation, useQueryClient } from "@tanstack/react-query";
+import axios from "axios";
 import { api } from "../api/client";
-import type { Person } from "../api/client";
+import type { DuplicateMatch, Person } from "../api/client";
+import { useChangeEvents } from "../api/useChangeEvents";
 import { Modal, Button } from "../components/ui/Shared";
 import { AppContext, type InitialPersonData } from "./AppContext";
 import {
@@ -46,10 +48,16 @@ export default function AppLayout() {
   const [initialPersonData, setInitialPersonData] =
     useState<InitialPersonData | null>(null);
 
+  const [duplicates, setDuplicates] = useState<DuplicateMatch[] | null>(null);
+  const [createError, setCreateError] = useState<string | null>(null);
+
   const queryClient = useQueryClient();
+  useChangeEvents();
 
   const openAddPerson = (initialData?: InitialPersonData) => {
     setInitialPersonData(initialData || null);
+    setDuplicates(null);
+    setCreateError(null);
     setIsAddOpen(true);
   };
 
@@ -92,8 +100,35 @@ export default function AppLayout() {
       setIsAddOpen(false);
       setInitialPersonData(null);
     },
+    onError: (error) => {
+      // 409: the LinkedIn profile is already on file; let the user decide.
+      const detail = axios.isAxiosError(error)
+        ? error.response?.data?.detail
+        : undefined;
+      if (axios.isAxiosError(error) && error.response?.status === 409 && detail?.matches) {
+        setDuplicates(detail.matches as DuplicateMatch[]);
+        setCreateError(null);
+        return;
+      }
+      setDuplicates(null);
+      setCreateError(
+        typeof detail === "string" ? detail : "Could not save the contact."
+      );
+    },
   });
 
+  const submitPerson = (data: Record<string, unknown>) => {
+    setDuplicates(null);
+    setCreateError(null);
+    createPersonMutation.mutate(data);
+  };
+
+  const createAnyway = () => {
+    if (createPersonMutation.variables) {
+      submitPerson({ ...createPersonMutation.variables, allow_duplicate: true });
+    }
+  };
+
   return (
     <AppContext.Provider value={{ openAddPerson }}>
       <div className="min-h-screen bg-gray-50 flex flex-col">
@@ -150,7 +185,11 @@ export default function AppLayout() {
           isOpen={isAddOpen}
           initialData={initialPersonData}
           onClose={() => setIsAddOpen(false)}
-          onSubmit={createPersonMutation.mutate}
+          onSubmit={submitPerson}
+          isSaving={createPersonMutation.isPending}
+          duplicates={duplicates}
+          error={createError}
+          onCreateAnyway={createAnyway}
         />
       </div>
     </AppContext.Provider>
@@ -162,11 +201,19 @@ function AddPersonModal({
   initialData,
   onClose,
   onSubmit,
+  isSaving,
+  duplicates,
+  error,
+  onCreateAnyway,
 }: {
   isOpen: boolean;
   initialData?: InitialPersonData | null;
   onClose: () => void;
   onSubmit: (data: Record<string, unknown>) => void;
+  isSaving: boolean;
+  duplicates: DuplicateMatch[] | null;
+  error: string | null;
+  onCreateAnyway: () => void;
 }) {
   const [links, setLinks] = useState<string[]>([]);
   const [newLink, setNewLink] = useState("");
@@ -227,8 +274,13 @@ function AddPersonModal({
           }
         : null;
 
+    // The server checks the profile against existing contacts.
+    const linkedinUrl =
+      finalLinks.find((link) => /linkedin\.com\/(in|pub)\//i.test(link)) ?? null;
+
     onSubmit({
       name: formData.get("name"),
+      linkedin_url: linkedinUrl,
       company_name: formData.get("company"),
       title: formData.get("title"),
       relationship: formData.get("relationship"),
@@ -484,11 +536,47 @@ function AddPersonModal({
             placeholder="e.g. Hiring for X role..."
           ></textarea>
         </div>
+        {duplicates && duplicates.length > 0 && (
+          <div className="rounded-md border border-yellow-200 bg-yellow-50 p-3 text-sm text-yellow-900">
+            <div className="font-medium">
+              This LinkedIn profile is already on file:
+            </div>
+            <ul className="mt-1 list-disc pl-5">
+              {duplicates.map((match) => (
+                <li key={match.id}>
+                  <a
+                    href={`/people/${match.id}`}
+                    className="underline hover:text-yellow-700"
+                  >
+                    {match.name}
+                  </a>
+                </li>
+              ))}
+            </ul>
+            <Button
+              type="button"
+              variant="outline"
+              size="sm"
+              className="mt-2"
+              onClick={onCreateAnyway}
+              disabled={isSaving}
+            >
+              Create anyway
+            </Button>
+          </div>
+        )}
+        {error && (
+          <div className="rounded-md border border-red-200 bg-red-50 p-3 text-sm text-red-800">
+            {error}
+          </div>
+        )}
         <div className="flex justify-end gap-2 pt-4">
           <Button type="button" variant="ghost" onClick={onClose}>
             Cancel
           </Button>
-          <Button type="submit">Save Contact</Button>
+          <Button type="submit" disabled={isSaving}>
+            Save Contact
+          </Button>
         </div>
       </form>
     </Modal>
@@ -5,15 +5,20 @@ import { Card, Button, Modal } from "../components/ui/Shared";
 import { Search, Bookmark } from "lucide-react";
 
 interface NewsItem {
+  id: number;
   title: string;
   link: string;
   source: string;
   published: string;
   snippet: string;
+  matched_company_ids: number[];
+  matched_waitlist_ids: number[];
 }
 
 export default function RadarPage() {
   const [query, setQuery] = useState("H-1B sponsor hiring");
+  // Only submitted searches hit the API; a new query triggers a fetch upstream.
+  const [submittedQuery, setSubmittedQuery] = useState(query);
   const [selectedItem, setSelectedItem] = useState<NewsItem | null>(null);
   const queryClient = useQueryClient();
 
@@ -22,9 +27,9 @@ export default function RadarPage() {
     isLoading,
     refetch,
   } = useQuery<NewsItem[]>({
-    queryKey: ["radar", query],
+    queryKey: ["radar", submittedQuery],
     queryFn: async () => {
-      const res = await api.get(`/radar?query=${encodeURIComponent(query)}`);
+      const res = await api.get(`/radar?query=${encodeURIComponent(submittedQuery)}`);
       return res.data;
     },
   });
@@ -42,7 +47,8 @@ export default function RadarPage() {
 
   const handleSearch = (e: React.FormEvent) => {
     e.preventDefault();
-    refetch();
+    if (query === submittedQuery) refetch();
+    else setSubmittedQuery(query);
   };
 
   return (
@@ -75,8 +81,8 @@ export default function RadarPage() {
           <div className="text-center py-10">Scanning radar...</div>
         )}
 
-        {news?.map((item, i) => (
-          <Card key={i} className="p-4 hover:shadow-md transition-shadow">
+        {news?.map((item) => (
+          <Card key={item.id} className="p-4 hover:shadow-md transition-shadow">
             <div className="flex justify-between items-start">
               <div>
                 <h3 className="font-semibold text-gray-900 text-lg">
@@ -95,6 +101,12 @@ export default function RadarPage() {
                   </span>
                   <span>•</span>
                   <span>{item.published}</span>
+                  {(item.matched_company_ids.length > 0 ||
+                    item.matched_waitlist_ids.length > 0) && (
+                    <span className="rounded bg-amber-100 px-2 py-0.5 text-xs font-medium text-amber-800">
+                      {item.matched_company_ids.length > 0 ? "In pipeline" : "On waitlist"}
+                    </span>
+                  )}
                 </div>
                 <div
                   className="mt-2 text-gray-600 text-sm line-clamp-2"